@@ -1,12 +1,19 @@
 import streamlit as st
 import math
+import re
 import tempfile
 import os
+import shutil
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import numpy as np
 import base64
 from io import BytesIO
+from array import array
 
 # ============================================================================
 # CONFIGURATION DE LA PAGE
@@ -114,12 +121,64 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# ============================================================================
+# PRÉRÉGLAGES STANDARD
+# ============================================================================
+# Modules ISO courants et nombres de dents les plus demandés ; la grille
+# préchauffée peut être redéfinie par GEAR_WARMUP_MODULES / GEAR_WARMUP_TEETH
+STANDARD_MODULES = [1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0]
+COMMON_TEETH = [12, 16, 20, 24, 30, 40, 60]
+
+# Valeurs par défaut des autres paramètres (communes aux préréglages)
+DEFAULT_PARAMETERS = {
+    "pressure_angle": 20.0,
+    "thickness": 10.0,
+    "hub_diameter": 10.0,
+    "bore_diameter": 5.0,
+    "backlash": 0.1,
+    "mate_teeth": 20
+}
+
+CUSTOM_PRESET = "Personnalisé"
+
+
+def preset_label(module_value, teeth_value):
+    """Libellé d'un préréglage dans le sélecteur"""
+    return f"m = {module_value:g} mm · z = {teeth_value}"
+
+
+PRESETS = {
+    preset_label(m, z): (m, z) for m in STANDARD_MODULES for z in COMMON_TEETH
+}
+
+
+def apply_preset():
+    """Reporte le préréglage choisi sur les curseurs de la sidebar"""
+    choice = st.session_state["preset"]
+    if choice in PRESETS:
+        st.session_state["module"], st.session_state["teeth"] = PRESETS[choice]
+        st.session_state.update(DEFAULT_PARAMETERS)
+
+
+# Valeurs initiales des curseurs (pilotés par st.session_state)
+for key, default in {"module": 2.0, "teeth": 20, **DEFAULT_PARAMETERS}.items():
+    st.session_state.setdefault(key, default)
+
 # ============================================================================
 # SIDEBAR - PARAMÈTRES
 # ============================================================================
 with st.sidebar:
     st.markdown("### 🔧 Paramètres de l'engrenage")
     
+    # Préréglages standard (précalculés au démarrage)
+    st.selectbox(
+        "📚 Préréglage",
+        [CUSTOM_PRESET] + list(PRESETS),
+        key="preset",
+        on_change=apply_preset,
+        help="Modules ISO et nombres de dents courants, précalculés au démarrage du serveur"
+    )
+    
     # Section : Paramètres principaux
     with st.container():
         st.markdown("#### 📏 Dimensions principales")
@@ -128,7 +187,7 @@ with st.sidebar:
             "**Module (m) [mm]**",
             min_value=0.5,
             max_value=20.0,
-            value=2.0,
+            key="module",
             step=0.5,
             help="Taille standard des dents. Valeurs typiques : 1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10 mm"
         )
@@ -137,7 +196,7 @@ with st.sidebar:
             "**Nombre de dents (z)**",
             min_value=8,
             max_value=200,
-            value=20,
+            key="teeth",
             step=1,
             help="Nombre de dents de l'engrenage (8 minimum recommandé)"
         )
@@ -145,7 +204,7 @@ with st.sidebar:
         pressure_angle = st.select_slider(
             "**Angle de pression (α) [°]**",
             options=[14.5, 17.5, 20.0, 22.5, 25.0],
-            value=20.0,
+            key="pressure_angle",
             help="Angle standard : 20° (14.5° pour anciens standards, 25° pour haute résistance)"
         )
         
@@ -153,7 +212,7 @@ with st.sidebar:
             "**Épaisseur (b) [mm]**",
             min_value=1.0,
             max_value=100.0,
-            value=10.0,
+            key="thickness",
             step=1.0,
             help="Largeur axiale de l'engrenage"
         )
@@ -166,7 +225,7 @@ with st.sidebar:
             "Diamètre du moyeu [mm]",
             min_value=0.0,
             max_value=100.0,
-            value=10.0,
+            key="hub_diameter",
             step=1.0,
             help="Diamètre central pour l'arbre (0 = pas de moyeu)"
         )
@@ -175,7 +234,7 @@ with st.sidebar:
             "Diamètre d'alésage [mm]",
             min_value=0.0,
             max_value=50.0,
-            value=5.0,
+            key="bore_diameter",
             step=0.5,
             help="Diamètre du trou central (0 = pas d'alésage)"
         )
@@ -184,7 +243,7 @@ with st.sidebar:
             "Jeu (backlash) [mm]",
             min_value=0.0,
             max_value=2.0,
-            value=0.1,
+            key="backlash",
             step=0.05,
             help="Jeu entre les dents en prise"
         )
@@ -198,6 +257,17 @@ with st.sidebar:
             help="Rayon à la base des dents"
         )
     
+    # Section : Engrènement
+    with st.expander("🔗 **Engrènement**", expanded=False):
+        mate_teeth = st.slider(
+            "Dents de la roue conjuguée",
+            min_value=8,
+            max_value=200,
+            key="mate_teeth",
+            step=1,
+            help="Nombre de dents de la roue en prise, utilisée pour vérifier le jeu et l'interférence"
+        )
+    
     # Section : Matériau
     with st.expander("🔩 **Propriétés matériau**", expanded=False):
         material = st.selectbox(
@@ -347,12 +417,580 @@ class GearCalculator:
         
         return 1.5
 
+    @staticmethod
+    def calculate_arrays(module, teeth, pressure_angle, thickness,
+                         hub_diameter=0, bore_diameter=0):
+        """Version vectorisée de calculate_all_properties (tableaux NumPy diffusés)"""
+        module, teeth, pressure_angle, thickness, bore_diameter = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in
+              (module, teeth, pressure_angle, thickness, bore_diameter))
+        )
+
+        pitch_diameter = module * teeth
+        outer_diameter = pitch_diameter + 2 * module
+        base_diameter = pitch_diameter * np.cos(np.radians(pressure_angle))
+        root_diameter = pitch_diameter - 2 * 1.25 * module
+        circular_pitch = np.pi * module
+
+        # Mêmes approximations que calculate_volume et calculate_contact_ratio
+        volume = np.pi * ((root_diameter / 2)**2 - (bore_diameter / 2)**2) * thickness * 1.2
+        base_pitch = circular_pitch * np.cos(np.radians(pressure_angle))
+        outer_r, base_r = outer_diameter / 2, base_diameter / 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            contact_ratio = np.sqrt(np.maximum(outer_r**2 - base_r**2, 0)) / base_pitch
+        contact_ratio = np.where(
+            (outer_r > base_r) & (base_pitch > 0), np.clip(contact_ratio, 1.0, 2.5), 1.5
+        )
+
+        return {
+            "primitif": pitch_diameter,
+            "externe": outer_diameter,
+            "base": base_diameter,
+            "fond": root_diameter,
+            "hauteur": 2.25 * module,
+            "volume": volume,
+            "masse": volume * 7.85e-6,
+            "rapport_contact": contact_ratio
+        }
+
+
+class GearProfile:
+    """Classe pour générer le contour 2D en développante d'un engrenage droit"""
+
+    @staticmethod
+    def involute(alpha):
+        """Fonction développante inv(α) = tan(α) - α"""
+        return np.tan(alpha) - alpha
+
+    @staticmethod
+    def land_points(points_per_flank):
+        """Nombre de points intérieurs du sommet et du fond de chaque dent"""
+        return max(points_per_flank // 8, 2), max(points_per_flank // 4, 2)
+
+    @staticmethod
+    def tooth_error(module, teeth, pressure_angle, backlash=0):
+        """Motif d'une dent irréalisable avec ce jeu, ou None
+
+        Le jeu doit rester inférieur au demi-pas circulaire et laisser une
+        épaisseur non nulle au cercle de tête (dent non pointue).
+        """
+        half_pitch = math.pi * module / 2
+        if backlash >= half_pitch:
+            return (f"jeu de {backlash:g} mm supérieur ou égal au demi-pas "
+                    f"({half_pitch:.3f} mm) pour m = {module:g} mm")
+
+        alpha = math.radians(pressure_angle)
+        pitch_r = module * teeth / 2
+        alpha_tip = math.acos(pitch_r * math.cos(alpha) / (pitch_r + module))
+        tip_half_angle = ((half_pitch - backlash / 2) / (2 * pitch_r)
+                          + GearProfile.involute(alpha) - GearProfile.involute(alpha_tip))
+        if tip_half_angle <= 0:
+            return (f"dents pointues au cercle de tête avec un jeu de {backlash:g} mm "
+                    f"(m = {module:g} mm, z = {teeth})")
+        return None
+
+    @staticmethod
+    def generate_outline(module, teeth, pressure_angle, backlash=0,
+                         points_per_flank=40):
+        """Génère le contour fermé (sens trigonométrique), dent 0 centrée sur +x
+
+        Le jeu est réparti moitié-moitié entre les deux roues : l'épaisseur
+        de dent au primitif vaut p/2 - jeu/2.
+        """
+        alpha = math.radians(pressure_angle)
+        pitch_r = module * teeth / 2
+        base_r = pitch_r * math.cos(alpha)
+        outer_r = pitch_r + module
+        root_r = pitch_r - 1.25 * module
+
+        # Rayons le long d'un flanc : segment radial sous le cercle de base
+        if root_r < base_r:
+            radii = np.concatenate((
+                [root_r],
+                np.linspace(base_r, outer_r, points_per_flank - 1)
+            ))
+        else:
+            radii = np.linspace(root_r, outer_r, points_per_flank)
+
+        # Demi-épaisseur angulaire de la dent au rayon r
+        half_pitch_thickness = (math.pi * module / 2 - backlash / 2) / (2 * pitch_r)
+        alpha_r = np.arccos(np.clip(base_r / radii, -1.0, 1.0))
+        psi = half_pitch_thickness + GearProfile.involute(alpha) - GearProfile.involute(alpha_r)
+        psi = np.maximum(psi, 0.0)
+
+        tooth_angle = 2 * math.pi / teeth
+        n_tip, n_root = GearProfile.land_points(points_per_flank)
+
+        tip = np.linspace(-psi[-1], psi[-1], n_tip + 2)[1:-1]
+        root = np.linspace(psi[0], tooth_angle - psi[0], n_root + 2)[1:-1]
+
+        angles = np.concatenate((-psi, tip, psi[::-1], root))
+        rads = np.concatenate((radii, np.full(n_tip, outer_r), radii[::-1],
+                               np.full(n_root, root_r)))
+
+        # Répétition vectorisée de la dent sur toute la circonférence
+        all_angles = (angles[None, :] + tooth_angle * np.arange(teeth)[:, None]).ravel()
+        all_rads = np.tile(rads, teeth)
+
+        return np.column_stack((all_rads * np.cos(all_angles),
+                                all_rads * np.sin(all_angles)))
+
+# ============================================================================
+# VÉRIFICATION D'ENGRÈNEMENT (JEU ET INTERFÉRENCE)
+# ============================================================================
+class MeshingChecker:
+    """Classe pour vérifier le jeu et l'interférence de deux engrenages en prise"""
+
+    @staticmethod
+    def build_segment_grid(outline, cell_size):
+        """Indexe les segments du contour dans une grille régulière (format CSR)"""
+        a = outline
+        b = np.roll(outline, -1, axis=0)
+
+        extent = np.abs(outline).max() + 2 * cell_size
+        n_cells = int(math.ceil(2 * extent / cell_size)) + 1
+
+        lo = (np.minimum(a, b) + extent) // cell_size
+        hi = (np.maximum(a, b) + extent) // cell_size
+        lo = lo.astype(np.int64)
+        hi = hi.astype(np.int64)
+
+        # Chaque segment est inscrit dans toutes les cellules de sa boîte englobante
+        span_x = hi[:, 0] - lo[:, 0] + 1
+        span_y = hi[:, 1] - lo[:, 1] + 1
+        count = span_x * span_y
+        seg_ids = np.repeat(np.arange(len(a)), count)
+        local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        ix = lo[seg_ids, 0] + local // span_y[seg_ids]
+        iy = lo[seg_ids, 1] + local % span_y[seg_ids]
+        keys = ix * n_cells + iy
+
+        order = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=n_cells * n_cells)
+        starts = np.concatenate(([0], np.cumsum(counts)))
+
+        # Contour en coordonnées polaires pour le test d'appartenance (contour
+        # étoilé) ; l'ordre du contour est conservé aux segments radiaux
+        polar_angle = np.maximum.accumulate(np.unwrap(np.arctan2(outline[:, 1], outline[:, 0])))
+        polar_angle = np.append(polar_angle, polar_angle[0] + 2 * math.pi)
+        polar_radius = np.hypot(outline[:, 0], outline[:, 1])
+        polar_radius = np.append(polar_radius, polar_radius[0])
+
+        return {
+            "a": a,
+            "b": b,
+            "cell_size": cell_size,
+            "extent": extent,
+            "n_cells": n_cells,
+            "segments": seg_ids[order],
+            "starts": starts,
+            "polar_angle": polar_angle,
+            "polar_radius": polar_radius
+        }
+
+    @staticmethod
+    def query_distances(points, grid, chunk_size=20000):
+        """Distance minimale point-segment (inf au-delà d'une cellule)"""
+        return np.concatenate([
+            MeshingChecker._query_chunk(points[lo:lo + chunk_size], grid)
+            for lo in range(0, len(points), chunk_size)
+        ]) if len(points) else np.zeros(0)
+
+    @staticmethod
+    def _query_chunk(points, grid):
+        """Requête vectorisée sur un bloc de points (mémoire bornée)"""
+        h = grid["cell_size"]
+        n_cells = grid["n_cells"]
+        cells = ((points + grid["extent"]) // h).astype(np.int64)
+        cells = np.clip(cells, 1, n_cells - 2)
+
+        offsets = np.array([-1, 0, 1])
+        ix = cells[:, 0, None, None] + offsets[None, :, None]
+        iy = cells[:, 1, None, None] + offsets[None, None, :]
+        keys = (ix * n_cells + iy).reshape(len(points), 9)
+
+        start = grid["starts"][keys].ravel()
+        count = grid["starts"][keys + 1].ravel() - start
+        total = int(count.sum())
+
+        distances = np.full(len(points), np.inf)
+        if total == 0:
+            return distances
+
+        # Expansion vectorisée des paires (point, segment candidat)
+        pair_point = np.repeat(np.repeat(np.arange(len(points)), 9), count)
+        first = np.cumsum(count) - count
+        pair_slot = np.arange(total) - np.repeat(first - start, count)
+        pair_seg = grid["segments"][pair_slot]
+
+        p = points[pair_point]
+        a = grid["a"][pair_seg]
+        ab = grid["b"][pair_seg] - a
+        ap = p - a
+        length_sq = np.einsum("ij,ij->i", ab, ab)
+        t = np.einsum("ij,ij->i", ap, ab) / np.where(length_sq > 0, length_sq, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        d = np.hypot(ap[:, 0] - t * ab[:, 0], ap[:, 1] - t * ab[:, 1])
+
+        per_point = count.reshape(len(points), 9).sum(axis=1)
+        has_pairs = per_point > 0
+        bounds = np.concatenate(([0], np.cumsum(per_point)))[:-1][has_pairs]
+        distances[has_pairs] = np.minimum.reduceat(d, bounds)
+        return distances
+
+    @staticmethod
+    def signed_clearance(points, grid):
+        """Distance signée au contour : négative si le point pénètre la denture"""
+        distances = MeshingChecker.query_distances(points, grid)
+        start = grid["polar_angle"][0]
+        angle = (np.arctan2(points[:, 1], points[:, 0]) - start) % (2 * math.pi) + start
+        boundary = np.interp(angle, grid["polar_angle"], grid["polar_radius"])
+        depth = boundary - np.hypot(points[:, 0], points[:, 1])
+        inside = depth > 0
+        distances = np.where(np.isfinite(distances), distances, np.abs(depth))
+        return np.where(inside, -distances, distances)
+
+    @staticmethod
+    def _relative_points(outline, own_angles, own_center, other_angles, other_center):
+        """Exprime le contour d'une roue dans le repère tournant de l'autre"""
+        rel = own_angles[:, None] - other_angles[:, None]
+        cos_r, sin_r = np.cos(rel), np.sin(rel)
+        shift = own_center - other_center
+        cos_o, sin_o = np.cos(-other_angles)[:, None], np.sin(-other_angles)[:, None]
+        x = cos_r * outline[None, :, 0] - sin_r * outline[None, :, 1] \
+            + cos_o * shift[0] - sin_o * shift[1]
+        y = sin_r * outline[None, :, 0] + cos_r * outline[None, :, 1] \
+            + sin_o * shift[0] + cos_o * shift[1]
+        return x, y
+
+    @staticmethod
+    def check_mesh(module, teeth, mate_teeth, pressure_angle, backlash=0,
+                   steps=72, points_per_flank=40, tolerance=None):
+        """Fait tourner deux roues à l'entraxe sur un cycle d'engrènement
+
+        Les roues sont positionnées dents centrées (jeu réparti sur les deux
+        flancs). Retourne le jeu de flanc minimal et l'interférence maximale
+        à chaque pas angulaire ; "erreur" signale une dent irréalisable
+        (jeu trop grand ou dent pointue), ce qui invalide l'engrènement.
+        """
+        error = (GearProfile.tooth_error(module, teeth, pressure_angle, backlash)
+                 or GearProfile.tooth_error(module, mate_teeth, pressure_angle, backlash))
+        center_distance = module * (teeth + mate_teeth) / 2
+        if tolerance is None:
+            # Flancs en développante et arcs de tête/fond sont convexes : leurs
+            # cordes restent dans la matière, l'échantillonnage ne peut donc que
+            # surestimer le jeu. Seul l'arrondi flottant reste à absorber.
+            tolerance = 1e-9 * (center_distance + 2 * module)
+        outlines = (
+            GearProfile.generate_outline(module, teeth, pressure_angle, backlash, points_per_flank),
+            GearProfile.generate_outline(module, mate_teeth, pressure_angle, backlash, points_per_flank)
+        )
+        centers = (np.array([0.0, 0.0]), np.array([center_distance, 0.0]))
+        outer_radii = (module * teeth / 2 + module, module * mate_teeth / 2 + module)
+        root_radii = (module * teeth / 2 - 1.25 * module,
+                      module * mate_teeth / 2 - 1.25 * module)
+
+        # Cellule de quelques segments ; au-delà d'une cellule, la distance
+        # est estimée radialement (jeu déjà confortable)
+        seg_len = max(np.median(np.hypot(*np.diff(o, axis=0, append=o[:1]).T)) for o in outlines)
+        cell_size = max(4 * seg_len, module / 4)
+        grids = [MeshingChecker.build_segment_grid(o, cell_size) for o in outlines]
+
+        # Un cycle d'engrènement = rotation d'un pas angulaire de la roue 1
+        angle_1 = np.linspace(0, 2 * math.pi / teeth, steps, endpoint=False)
+        angle_2 = math.pi + math.pi / mate_teeth - angle_1 * teeth / mate_teeth
+        angles = (angle_1, angle_2)
+
+        flank_clearance = np.full(steps, np.inf)
+        interference = np.zeros(steps)
+
+        for own, other in ((0, 1), (1, 0)):
+            outline = outlines[own]
+            radius = np.hypot(outline[:, 0], outline[:, 1])
+
+            # Seuls les points susceptibles d'atteindre l'autre roue sont testés
+            near = radius > center_distance - outer_radii[other] - cell_size
+            flank = (radius[near] > root_radii[own] + 1e-9) & (radius[near] < outer_radii[own] - 1e-9)
+            x, y = MeshingChecker._relative_points(
+                outline[near], angles[own], centers[own], angles[other], centers[other]
+            )
+            candidate = np.hypot(x, y) < outer_radii[other] + cell_size
+            step_idx = np.nonzero(candidate)[0]
+            if len(step_idx) == 0:
+                continue
+
+            points = np.column_stack((x[candidate], y[candidate]))
+            clearance = MeshingChecker.signed_clearance(points, grids[other])
+            is_flank = np.broadcast_to(flank, candidate.shape)[candidate]
+
+            np.minimum.at(flank_clearance, step_idx[is_flank], clearance[is_flank])
+            np.maximum.at(interference, step_idx, -clearance)
+
+        interference = np.maximum(interference, 0.0)
+        max_interference = float(interference.max())
+
+        return {
+            "entraxe": center_distance,
+            "angles": np.degrees(angle_1),
+            "jeu_par_position": flank_clearance,
+            "interference_par_position": interference,
+            "jeu_flanc_min": float(flank_clearance.min()),
+            "jeu_theorique": backlash * math.cos(math.radians(pressure_angle)) / 2,
+            "interference_max": max_interference,
+            "erreur": error,
+            "valide": error is None and max_interference <= tolerance
+        }
+
+# ============================================================================
+# TRAIN D'ENGRENAGES (CINÉMATIQUE ET COUPLES)
+# ============================================================================
+class GearTrain:
+    """Classe pour simuler un train d'engrenages droits à plusieurs étages"""
+
+    @staticmethod
+    def layout(stages):
+        """Centres des roues menantes et menées pour l'animation, formes (étages, 2)
+
+        Chaque arbre est décalé de l'entraxe de son étage selon x et chaque
+        étage est dessiné sur sa propre rangée selon y : les roues d'un même
+        arbre intermédiaire ne se recouvrent pas et seules les roues d'une
+        même paire se touchent.
+        """
+        modules = np.array([s["module"] for s in stages], dtype=float)
+        z_driver = np.array([s["z_menant"] for s in stages], dtype=float)
+        z_driven = np.array([s["z_mene"] for s in stages], dtype=float)
+
+        shaft_x = np.concatenate(([0.0], np.cumsum(modules * (z_driver + z_driven) / 2)))
+
+        # Rangées espacées du rayon de tête de la plus grande roue de chaque étage
+        tip_radius = modules * (np.maximum(z_driver, z_driven) + 2) / 2
+        gaps = tip_radius[:-1] + tip_radius[1:] + 2 * np.maximum(modules[:-1], modules[1:])
+        row_y = -np.concatenate(([0.0], np.cumsum(gaps)))
+
+        return (np.column_stack((shaft_x[:-1], row_y)),
+                np.column_stack((shaft_x[1:], row_y)))
+
+    @staticmethod
+    def simulate(stages, time, input_speed, input_torque):
+        """Simule vitesses, couples et efforts sur tous les arbres
+
+        Args:
+            stages: liste de dicts (module, z_menant, z_mene, angle_pression, rendement)
+            time: instants [s], tableau 1D
+            input_speed: vitesse de l'arbre d'entrée [tr/min], scalaire ou tableau
+            input_torque: couple d'entrée [N·m], scalaire ou tableau
+
+        Les grandeurs par arbre ont la forme (étages + 1, instants), les
+        grandeurs par engrènement la forme (étages, instants).
+        """
+        time = np.asarray(time, dtype=float)
+        input_speed = np.broadcast_to(np.asarray(input_speed, dtype=float), time.shape)
+        input_torque = np.broadcast_to(np.asarray(input_torque, dtype=float), time.shape)
+
+        modules = np.array([s["module"] for s in stages], dtype=float)
+        z_driver = np.array([s["z_menant"] for s in stages], dtype=float)
+        z_driven = np.array([s["z_mene"] for s in stages], dtype=float)
+        pressure = np.radians([s["angle_pression"] for s in stages])
+        efficiency = np.array([s["rendement"] for s in stages], dtype=float)
+
+        # Rapports cumulés : les roues extérieures inversent le sens de rotation
+        ratio = z_driven / z_driver
+        speed_factor = np.concatenate(([1.0], np.cumprod(-1.0 / ratio)))
+        torque_factor = np.concatenate(([1.0], np.cumprod(ratio * efficiency)))
+
+        speeds = speed_factor[:, None] * input_speed[None, :]
+        torques = torque_factor[:, None] * input_torque[None, :]
+        powers = torques * np.abs(speeds) * 2 * math.pi / 60
+
+        # Angles des arbres par intégration trapézoïdale de la vitesse
+        dt = np.diff(time)
+        increments = (speeds[:, 1:] + speeds[:, :-1]) / 2 * dt[None, :] * 2 * math.pi / 60
+        angles = np.concatenate((np.zeros((len(speeds), 1)), np.cumsum(increments, axis=1)), axis=1)
+
+        # Efforts à chaque engrènement, calculés sur la roue menante
+        driver_diameter = (modules * z_driver)[:, None]
+        pitch_velocity = math.pi * driver_diameter / 1000 * np.abs(speeds[:-1]) / 60
+        tangential_load = 2000 * torques[:-1] / driver_diameter
+        radial_load = tangential_load * np.tan(pressure)[:, None]
+
+        return {
+            "temps": time,
+            "rapport_global": float(np.prod(ratio)),
+            "rendement_global": float(np.prod(efficiency)),
+            "arbres": {
+                "vitesse": speeds,
+                "couple": torques,
+                "puissance": powers,
+                "angle": angles
+            },
+            "engrenements": {
+                "vitesse_primitive": pitch_velocity,
+                "effort_tangentiel": tangential_load,
+                "effort_radial": radial_load,
+                "effort_normal": np.hypot(tangential_load, radial_load)
+            }
+        }
+
+    @staticmethod
+    def gear_angles(stages, shaft_angles):
+        """Angles absolus de chaque roue (menante puis menée) pour l'animation
+
+        Les phases sont choisies pour que les dents de chaque paire s'engrènent.
+        """
+        z_driven = np.array([s["z_mene"] for s in stages], dtype=float)
+        phase = math.pi + math.pi / z_driven
+        return shaft_angles[:-1], shaft_angles[1:] + phase[:, None]
+
+# ============================================================================
+# MAILLAGE 3D ET NIVEAUX DE DÉTAIL
+# ============================================================================
+# Résolution du contour fin, dont les niveaux plus grossiers sont décimés
+FINE_POINTS_PER_FLANK = 48
+
+# Pas de décimation du contour et points de l'anneau intérieur par dent
+LOD_LEVELS = {
+    "grossier": {"decimation": 8, "anneau": 2},
+    "moyen": {"decimation": 3, "anneau": 4},
+    "fin": {"decimation": 1, "anneau": 8}
+}
+
+
+class GearMesh:
+    """Classe pour construire le maillage 3D fermé d'un engrenage"""
+
+    @staticmethod
+    def decimation_mask(teeth, points_per_flank, step):
+        """Masque de décimation du contour fin, repères de la dent conservés"""
+        n_tip, n_root = GearProfile.land_points(points_per_flank)
+        per_tooth = 2 * points_per_flank + n_tip + n_root
+        keep = np.arange(per_tooth) % step == 0
+
+        # Pieds, cercle de base et sommets des deux flancs, milieu du fond
+        flank_b = points_per_flank + n_tip
+        keep[[0, 1, points_per_flank - 1, flank_b, flank_b + points_per_flank - 2,
+              flank_b + points_per_flank - 1, flank_b + points_per_flank + n_root // 2]] = True
+        return np.tile(keep, teeth)
+
+    @staticmethod
+    def extrude(outline, inner_radius, ring_points, thickness, bore=True):
+        """Extrude le contour entre z=0 et z=épaisseur
+
+        Les faces planes relient le contour à un anneau intérieur (alésage, ou
+        anneau de construction refermé sur l'axe) par fusion des angles
+        polaires, ce qui évite les triangles dégénérés des segments radiaux.
+        Retourne les sommets (N, 3) et les faces (M, 3) orientées vers l'extérieur.
+        """
+        n_o = len(outline)
+        n_r = ring_points
+
+        angle_o = np.unwrap(np.arctan2(outline[:, 1], outline[:, 0]))
+        angle_r = angle_o[0] + 2 * math.pi * (np.arange(n_r) + 0.5) / n_r
+        ring = inner_radius * np.column_stack((np.cos(angle_r), np.sin(angle_r)))
+
+        # Fusion des deux anneaux : chaque événement ajoute un triangle
+        keys = np.concatenate((np.append(angle_o[1:], angle_o[0] + 2 * math.pi),
+                               np.append(angle_r[1:], angle_r[0] + 2 * math.pi)))
+        is_outer = np.argsort(keys, kind="stable") < n_o
+        i = np.cumsum(is_outer) - is_outer
+        j = np.cumsum(~is_outer) - ~is_outer
+
+        ring_j = n_o + j % n_r
+        third = np.where(is_outer, (i + 1) % n_o, n_o + (j + 1) % n_r)
+        face = np.column_stack((ring_j, i % n_o, third))
+
+        layer = n_o + n_r
+        k_o = np.arange(n_o)
+        k_r = np.arange(n_r)
+        next_o = (k_o + 1) % n_o
+        next_r = (k_r + 1) % n_r
+
+        outer_wall = np.concatenate((
+            np.column_stack((k_o, next_o, next_o + layer)),
+            np.column_stack((k_o, next_o + layer, k_o + layer))
+        ))
+
+        profile = np.vstack((outline, ring))
+        vertices = np.vstack((
+            np.column_stack((profile, np.zeros(layer))),
+            np.column_stack((profile, np.full(layer, thickness)))
+        ))
+        faces = [face + layer, face[:, [0, 2, 1]], outer_wall]
+
+        if bore:
+            r0 = n_o + k_r
+            r1 = n_o + next_r
+            faces.append(np.concatenate((
+                np.column_stack((r0, r1 + layer, r1)),
+                np.column_stack((r0, r0 + layer, r1 + layer))
+            )))
+        else:
+            # Éventail refermant l'anneau sur l'axe
+            center = 2 * layer
+            vertices = np.vstack((vertices, [[0.0, 0.0, 0.0], [0.0, 0.0, thickness]]))
+            r0 = n_o + k_r
+            r1 = n_o + next_r
+            faces.append(np.column_stack((np.full(n_r, center + 1), r0 + layer, r1 + layer)))
+            faces.append(np.column_stack((np.full(n_r, center), r1, r0)))
+
+        return vertices, np.concatenate(faces).astype(np.int64)
+
+    @staticmethod
+    def max_bore_diameter(module, teeth):
+        """Alésage maximal maillable : 95 % du diamètre de fond"""
+        return 0.95 * (module * teeth - 2.5 * module)
+
+    @staticmethod
+    def build(fine_outline, module, teeth, thickness, bore_diameter=0, level="fin"):
+        """Construit le maillage d'un niveau de détail à partir du contour fin
+
+        Lève ValueError si l'alésage atteint le fond des dents.
+        """
+        max_bore = GearMesh.max_bore_diameter(module, teeth)
+        if bore_diameter >= max_bore:
+            raise ValueError(
+                f"Alésage de {bore_diameter:g} mm trop grand pour m = {module:g} mm, "
+                f"z = {teeth} : {max_bore:.2f} mm au maximum"
+            )
+
+        settings = LOD_LEVELS[level]
+        outline = fine_outline[
+            GearMesh.decimation_mask(teeth, FINE_POINTS_PER_FLANK, settings["decimation"])
+        ]
+
+        root_radius = module * teeth / 2 - 1.25 * module
+        bore = bore_diameter > 0
+        inner_radius = bore_diameter / 2 if bore else root_radius / 2
+
+        vertices, faces = GearMesh.extrude(
+            outline, inner_radius, teeth * settings["anneau"], thickness, bore
+        )
+        return {"contour": outline, "sommets": vertices, "faces": faces}
+
 # ============================================================================
 # FONCTIONS DE GÉNÉRATION DE FICHIERS
 # ============================================================================
+# Enregistrement d'une facette STL binaire (50 octets, petit-boutiste)
+STL_FACET_DTYPE = np.dtype([
+    ("normale", "<f4", (3,)),
+    ("sommets", "<f4", (3, 3)),
+    ("attribut", "<u2")
+])
+
+
 class StepGenerator:
     """Classe pour générer des fichiers STEP"""
     
+    @staticmethod
+    def stored_parameters(module, teeth, pressure_angle, thickness):
+        """Valeurs écrites dans le bloc MEASURE_REPRESENTATION_ITEM (#1110-#1150)"""
+        return {
+            "Module": module / 1000.0,
+            "Teeth Count": teeth,
+            "Pressure Angle": math.radians(pressure_angle),
+            "Face Width": thickness / 1000.0,
+            "Pitch Diameter": module * teeth / 2000.0
+        }
+
     @staticmethod
     def create_step_file(module, teeth, pressure_angle, thickness, 
                         hub_diameter=0, bore_diameter=0, backlash=0):
@@ -360,6 +998,7 @@ class StepGenerator:
         
         timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
         pitch_diameter = module * teeth
+        stored = StepGenerator.stored_parameters(module, teeth, pressure_angle, thickness)
         
         step_content = f"""ISO-10303-21;
 HEADER;
@@ -460,11 +1099,11 @@ DATA;
 /* GEAR PROPERTIES */
 #1100 = MECHANICAL_DESIGN_GEOMETRIC_PRESENTATION_REPRESENTATION('Gear Data', 
     (#1110, #1120, #1130, #1140, #1150), #40);
-#1110 = MEASURE_REPRESENTATION_ITEM('Module', (LENGTH_MEASURE({module/1000.0})));
-#1120 = MEASURE_REPRESENTATION_ITEM('Teeth Count', (COUNT_MEASURE({teeth})));
-#1130 = MEASURE_REPRESENTATION_ITEM('Pressure Angle', (PLANE_ANGLE_MEASURE({math.radians(pressure_angle)})));
-#1140 = MEASURE_REPRESENTATION_ITEM('Face Width', (LENGTH_MEASURE({thickness/1000.0})));
-#1150 = MEASURE_REPRESENTATION_ITEM('Pitch Diameter', (LENGTH_MEASURE({pitch_diameter/2000.0})));
+#1110 = MEASURE_REPRESENTATION_ITEM('Module', (LENGTH_MEASURE({stored['Module']})));
+#1120 = MEASURE_REPRESENTATION_ITEM('Teeth Count', (COUNT_MEASURE({stored['Teeth Count']})));
+#1130 = MEASURE_REPRESENTATION_ITEM('Pressure Angle', (PLANE_ANGLE_MEASURE({stored['Pressure Angle']})));
+#1140 = MEASURE_REPRESENTATION_ITEM('Face Width', (LENGTH_MEASURE({stored['Face Width']})));
+#1150 = MEASURE_REPRESENTATION_ITEM('Pitch Diameter', (LENGTH_MEASURE({stored['Pitch Diameter']})));
 
 ENDSEC;
 
@@ -474,37 +1113,1012 @@ END-ISO-10303-21;
         return step_content
     
     @staticmethod
-    def create_stl_preview(module, teeth, thickness):
-        """Crée un aperçu STL simplifié (pour visualisation)"""
-        # Note: Ceci est un placeholder pour une vraie génération STL
-        return f"""solid Spur_Gear_m{module}_z{teeth}
-  facet normal 0 0 1
-    outer loop
-      vertex 0 0 {thickness}
-      vertex {module*teeth/2} 0 {thickness}
-      vertex 0 {module*teeth/2} {thickness}
-    endloop
-  endfacet
-endsolid"""
+    def facet_normals(triangles):
+        """Normales unitaires des facettes (N, 3, 3)"""
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals / np.where(lengths > 0, lengths, 1.0)
+
+    @staticmethod
+    def create_stl_file(module, teeth, mesh):
+        """Crée un fichier STL ASCII à partir d'un maillage fermé"""
+        triangles = mesh["sommets"][mesh["faces"]]
+        normals = StepGenerator.facet_normals(triangles)
+
+        facet = (
+            "  facet normal %.6e %.6e %.6e\n"
+            "    outer loop\n"
+            "      vertex %.6e %.6e %.6e\n"
+            "      vertex %.6e %.6e %.6e\n"
+            "      vertex %.6e %.6e %.6e\n"
+            "    endloop\n"
+            "  endfacet\n"
+        )
+        data = np.hstack((normals, triangles.reshape(-1, 9)))
+        body = (facet * len(data)) % tuple(data.ravel())
+        return f"solid Spur_Gear_m{module}_z{teeth}\n{body}endsolid Spur_Gear_m{module}_z{teeth}\n"
+
+    @staticmethod
+    def write_stl_binary(path, module, teeth, mesh, chunk_size=65536):
+        """Écrit un STL binaire sur disque via np.memmap, bloc par bloc
+
+        La taille du fichier est connue d'avance (84 + 50 octets par facette) :
+        la mémoire utilisée ne dépend que de la taille des blocs, pas du maillage.
+        Retourne la taille du fichier en octets.
+        """
+        vertices = mesh["sommets"]
+        faces = mesh["faces"]
+        n_facets = len(faces)
+        size = 84 + STL_FACET_DTYPE.itemsize * n_facets
+
+        header = f"Spur_Gear_m{module}_z{teeth} - Gear Generator v2.0".encode("ascii")
+        with open(path, "wb") as stl_file:
+            stl_file.write(header[:80].ljust(80, b" "))
+            stl_file.write(np.uint32(n_facets).tobytes())
+            stl_file.truncate(size)
+
+        # Une fenêtre projetée par bloc, libérée aussitôt écrite
+        for lo in range(0, n_facets, chunk_size):
+            triangles = vertices[faces[lo:lo + chunk_size]]
+            block = np.memmap(path, dtype=STL_FACET_DTYPE, mode="r+",
+                              offset=84 + lo * STL_FACET_DTYPE.itemsize,
+                              shape=(len(triangles),))
+            block["normale"] = StepGenerator.facet_normals(triangles)
+            block["sommets"] = triangles
+            block["attribut"] = 0
+            block.flush()
+            del block
+
+        return size
+
+# ============================================================================
+# LECTURE ET VALIDATION DES FICHIERS STEP
+# ============================================================================
+class StepReader:
+    """Classe pour indexer et valider un fichier STEP en une seule passe"""
+
+    ENTITY_PATTERN = re.compile(rb"^\s*#(\d+)\s*=\s*\(?\s*([A-Za-z_][A-Za-z0-9_]*)")
+    REFERENCE_PATTERN = re.compile(rb"#(\d+)")
+    STRING_PATTERN = re.compile(rb"'(?:[^']|'')*'")
+    COMMENT_PATTERN = re.compile(rb"/\*.*?\*/")
+
+    @staticmethod
+    def index_stream(stream):
+        """Parcourt un flux binaire ligne à ligne et construit l'index des entités
+
+        Seule l'instruction en cours est gardée en mémoire ; l'index est stocké
+        dans des tableaux compacts (identifiant, position, longueur, type).
+        """
+        ids, offsets = array("q"), array("q")
+        lengths, type_ids = array("i"), array("H")
+        ref_sources, ref_targets = array("q"), array("q")
+        type_names = {}
+
+        first_line = None
+        last_line = b""
+        in_data = False
+        in_comment = False
+        statement = []
+        statement_start = 0
+        position = 0
+
+        for line in stream:
+            line_start = position
+            position += len(line)
+            stripped = line.strip()
+            if first_line is None:
+                first_line = stripped
+            if stripped:
+                last_line = stripped
+
+            # Commentaires /* ... */ éventuellement sur plusieurs lignes
+            if in_comment:
+                if b"*/" not in line:
+                    continue
+                line = line.split(b"*/", 1)[1]
+                in_comment = False
+            if b"/*" in line:
+                line = StepReader.COMMENT_PATTERN.sub(b"", line)
+                if b"/*" in line:
+                    line, in_comment = line.split(b"/*", 1)[0], True
+
+            if not in_data:
+                in_data = stripped == b"DATA;"
+                continue
+            if not statement:
+                if stripped == b"ENDSEC;":
+                    in_data = False
+                    continue
+                if not line.strip():
+                    continue
+                statement_start = line_start
+                text = line
+            else:
+                statement.append(line)
+                text = b"".join(statement)
+
+            if not text.rstrip().endswith(b";") or text.count(b"'") % 2:
+                if not statement:
+                    statement.append(line)
+                continue
+            statement = []
+
+            match = StepReader.ENTITY_PATTERN.match(text)
+            if match is None:
+                continue
+            entity_id = int(match.group(1))
+            type_name = match.group(2).upper()
+
+            ids.append(entity_id)
+            offsets.append(statement_start)
+            lengths.append(position - statement_start)
+            type_ids.append(type_names.setdefault(type_name, len(type_names)))
+
+            # Références hors chaînes de caractères, partie droite uniquement
+            body = text[match.end():]
+            if b"#" in body:
+                if b"'" in body:
+                    body = StepReader.STRING_PATTERN.sub(b"''", body)
+                for ref in StepReader.REFERENCE_PATTERN.findall(body):
+                    ref_sources.append(entity_id)
+                    ref_targets.append(int(ref))
+
+        def as_numpy(values, dtype):
+            return np.frombuffer(values, dtype=dtype) if len(values) else np.zeros(0, dtype)
+
+        index = {
+            "ids": as_numpy(ids, np.int64),
+            "positions": as_numpy(offsets, np.int64),
+            "longueurs": as_numpy(lengths, np.int32),
+            "types": as_numpy(type_ids, np.uint16),
+            "noms_types": {v: k.decode("ascii") for k, v in type_names.items()},
+            "references": (as_numpy(ref_sources, np.int64), as_numpy(ref_targets, np.int64)),
+            "entete": first_line == b"ISO-10303-21;",
+            "fin": last_line == b"END-ISO-10303-21;",
+            "taille": position
+        }
+
+        # Les identifiants sont presque toujours croissants : tri évité
+        if np.any(index["ids"][1:] < index["ids"][:-1]):
+            order = np.argsort(index["ids"], kind="stable")
+            for key in ("ids", "positions", "longueurs", "types"):
+                index[key] = index[key][order]
+
+        return index
+
+    @staticmethod
+    def find(index, entity_id):
+        """Position de l'entité dans l'index trié (ou -1)"""
+        i = np.searchsorted(index["ids"], entity_id)
+        return int(i) if i < len(index["ids"]) and index["ids"][i] == entity_id else -1
+
+    @staticmethod
+    def get_entity(stream, index, entity_id):
+        """Lecture paresseuse d'une entité : (type, texte) ou None"""
+        i = StepReader.find(index, entity_id)
+        if i < 0:
+            return None
+        stream.seek(int(index["positions"][i]))
+        text = stream.read(int(index["longueurs"][i])).decode("utf-8", errors="replace")
+        return index["noms_types"][int(index["types"][i])], text.strip()
+
+    @staticmethod
+    def check_references(index):
+        """Identifiants en double et références #n non résolues"""
+        ids = index["ids"]
+        duplicates = np.unique(ids[1:][ids[1:] == ids[:-1]])
+
+        sources, targets = index["references"]
+        pos = np.clip(np.searchsorted(ids, targets), 0, max(len(ids) - 1, 0))
+        resolved = (ids[pos] == targets) if len(ids) else np.zeros(len(targets), bool)
+        dangling = np.column_stack((sources[~resolved], targets[~resolved]))
+
+        return {"doublons": duplicates.tolist(), "references_orphelines": dangling.tolist()}
+
+    @staticmethod
+    def read_parameters(stream, index):
+        """Relit les MEASURE_REPRESENTATION_ITEM ('Nom', (MESURE(valeur)))"""
+        measure_type = [k for k, v in index["noms_types"].items()
+                        if v == "MEASURE_REPRESENTATION_ITEM"]
+        parameters = {}
+        if not measure_type:
+            return parameters
+
+        pattern = re.compile(r"'([^']*)'\s*,\s*\(\s*[A-Z_]+\s*\(\s*([-+0-9.Ee]+)\s*\)")
+        for entity_id in index["ids"][index["types"] == measure_type[0]]:
+            _, text = StepReader.get_entity(stream, index, int(entity_id))
+            match = pattern.search(text)
+            if match:
+                parameters[match.group(1)] = float(match.group(2))
+        return parameters
+
+    @staticmethod
+    def validate(stream, expected_parameters=None, rel_tol=1e-9):
+        """Valide la structure d'un fichier STEP et, si fourni, ses paramètres"""
+        index = StepReader.index_stream(stream)
+        graph = StepReader.check_references(index)
+        parameters = StepReader.read_parameters(stream, index)
+
+        mismatched = {}
+        for name, value in (expected_parameters or {}).items():
+            found = parameters.get(name)
+            if found is None or not math.isclose(found, value, rel_tol=rel_tol, abs_tol=1e-12):
+                mismatched[name] = (value, found)
+
+        return {
+            "entites": len(index["ids"]),
+            "taille": index["taille"],
+            "doublons": graph["doublons"],
+            "references_orphelines": graph["references_orphelines"],
+            "parametres": parameters,
+            "parametres_differents": mismatched,
+            "valide": (index["entete"] and index["fin"] and len(index["ids"]) > 0
+                       and not graph["doublons"] and not graph["references_orphelines"]
+                       and not mismatched)
+        }
+
+# ============================================================================
+# VALIDATION DES MAILLAGES (ÉTANCHÉITÉ ET QUALITÉ)
+# ============================================================================
+# Aire minimale d'un triangle, relative au carré de la diagonale du maillage
+DEGENERATE_AREA_TOL = 1e-12
+
+# Multiplicateurs du hachage des sommets soudés (constantes de mélange 64 bits)
+WELD_HASH_FACTORS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9],
+                             dtype=np.uint64)
+
+
+class MeshValidator:
+    """Classe pour vérifier qu'un maillage est fermé, 2-manifold et bien orienté"""
+
+    @staticmethod
+    def volume_bounds(module, teeth, pressure_angle, thickness, bore_diameter=0, rel_tol=1e-3):
+        """Volumes des couronnes de fond et de tête : encadrent le volume réel"""
+        properties = GearCalculator.calculate_all_properties(
+            module, teeth, pressure_angle, thickness, 0, bore_diameter
+        )
+        bore_area = math.pi * (bore_diameter / 2)**2
+        root_area = math.pi * (properties['diametres']['fond'] / 2)**2
+        outer_area = math.pi * (properties['diametres']['externe'] / 2)**2
+        return ((root_area - bore_area) * thickness * (1 - rel_tol),
+                (outer_area - bore_area) * thickness * (1 + rel_tol))
+
+    @staticmethod
+    def weld(triangles):
+        """Fusionne les sommets identiques d'une soupe de triangles (STL)
+
+        Les coordonnées sont hachées sur 64 bits puis comptées par np.unique ;
+        une vérification exacte bascule sur les clés de 12 octets en cas de
+        collision.
+        """
+        # + 0.0 confond -0.0 et 0.0, qui diffèrent octet par octet
+        points = np.ascontiguousarray(triangles, dtype="<f4").reshape(-1, 3) + np.float32(0)
+        bits = points.view("<u4").astype(np.uint64)
+        keys = bits[:, 0] * WELD_HASH_FACTORS[0]
+        keys += bits[:, 1] * WELD_HASH_FACTORS[1]
+        keys += bits[:, 2] * WELD_HASH_FACTORS[2]
+        keys ^= keys >> np.uint64(29)
+
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        vertices = np.empty((len(unique_keys), 3), dtype=points.dtype)
+        vertices[inverse] = points
+        if not np.array_equal(vertices[inverse], points):
+            exact = points.view(np.dtype((np.void, 12))).ravel()
+            _, first, inverse = np.unique(exact, return_index=True, return_inverse=True)
+            vertices = points[first]
+        return vertices, inverse.reshape(-1, 3)
+
+    @staticmethod
+    def edge_usage(faces, n_vertices):
+        """Compte les arêtes par hachage (sommet bas, sommet haut, sens)
+
+        Retourne, par arête non orientée, le nombre de facettes qui la
+        partagent, et le nombre d'arêtes parcourues deux fois dans le même sens.
+        """
+        start = faces.ravel().astype(np.int64)
+        end = faces[:, [1, 2, 0]].ravel().astype(np.int64)
+        keys = (np.minimum(start, end) * n_vertices + np.maximum(start, end)) * 2 + (start > end)
+
+        directed, counts = np.unique(keys, return_counts=True)
+        undirected = directed // 2
+        groups = np.flatnonzero(np.r_[True, undirected[1:] != undirected[:-1]])
+        usage = np.add.reduceat(counts, groups)
+        return usage, int(np.count_nonzero(counts > 1))
+
+    @staticmethod
+    def validate(vertices, faces, volume_bounds=None, normals=None):
+        """Valide l'étanchéité, l'orientation et la qualité des facettes
+
+        volume_bounds : (min, max) attendus pour le volume enfermé, ou None.
+        normals : normales stockées (STL) à comparer au sens des facettes.
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        faces = np.asarray(faces)
+        usage, misoriented = MeshValidator.edge_usage(faces, len(vertices))
+
+        # Aire (double) et volume signé (théorème de la divergence)
+        v0, v1, v2 = (vertices[faces[:, k]] for k in range(3))
+        cross = np.cross(v1 - v0, v2 - v0)
+        double_area = np.sqrt(np.einsum("ij,ij->i", cross, cross))
+        volume = float(np.einsum("ij,ij->i", v0, cross).sum() / 6)
+        diagonal = np.linalg.norm(vertices.max(axis=0) - vertices.min(axis=0)) if len(vertices) else 0.0
+        degenerate = int(np.count_nonzero(double_area <= 2 * DEGENERATE_AREA_TOL * diagonal**2))
+
+        flipped_normals = 0
+        if normals is not None:
+            flipped_normals = int(np.count_nonzero(np.einsum("ij,ij->i", np.asarray(normals, dtype=float), cross) < 0))
+
+        open_edges = int(np.count_nonzero(usage == 1))
+        non_manifold = int(np.count_nonzero(usage > 2))
+        volume_ok = volume > 0
+        if volume_bounds is not None:
+            volume_ok = volume_bounds[0] <= volume <= volume_bounds[1]
+
+        return {
+            "facettes": len(faces),
+            "sommets": len(vertices),
+            "aretes": len(usage),
+            "aretes_ouvertes": open_edges,
+            "aretes_non_manifold": non_manifold,
+            "aretes_mal_orientees": misoriented,
+            "triangles_degeneres": degenerate,
+            "normales_inversees": flipped_normals,
+            "volume": volume,
+            "volume_attendu": volume_bounds,
+            "valide": (len(faces) > 0 and open_edges == 0 and non_manifold == 0
+                       and misoriented == 0 and degenerate == 0
+                       and flipped_normals == 0 and volume_ok)
+        }
+
+    @staticmethod
+    def stl_size_error(path):
+        """Nombre de facettes annoncé par un STL binaire et contrôle de sa taille
+
+        Ne lit que l'en-tête : retourne (facettes, None), ou (facettes, rapport
+        invalide) si la taille du fichier ne correspond pas.
+        """
+        with open(path, "rb") as stl_file:
+            stl_file.seek(80)
+            n_facets = int(np.frombuffer(stl_file.read(4), dtype="<u4")[0])
+        if os.path.getsize(path) != 84 + STL_FACET_DTYPE.itemsize * n_facets:
+            return n_facets, {"facettes": n_facets, "valide": False,
+                              "erreur": "taille du fichier incohérente avec le nombre de facettes"}
+        return n_facets, None
+
+    @staticmethod
+    def validate_stl(path, volume_bounds=None, chunk_size=1 << 20):
+        """Relit un STL binaire par np.memmap, soude les sommets et le valide
+
+        Recopie et soude toutes les facettes : la mémoire croît avec le
+        maillage. L'export valide plutôt le maillage indexé dont le fichier
+        est issu (voir stl_size_error).
+        """
+        n_facets, error = MeshValidator.stl_size_error(path)
+        if error:
+            return {**error, "volume_attendu": volume_bounds}
+
+        facets = np.memmap(path, dtype=STL_FACET_DTYPE, mode="r", offset=84, shape=(n_facets,))
+        triangles = np.empty((n_facets, 3, 3), dtype="<f4")
+        normals = np.empty((n_facets, 3), dtype="<f4")
+        for lo in range(0, n_facets, chunk_size):
+            triangles[lo:lo + chunk_size] = facets["sommets"][lo:lo + chunk_size]
+            normals[lo:lo + chunk_size] = facets["normale"][lo:lo + chunk_size]
+        del facets
+
+        vertices, faces = MeshValidator.weld(triangles)
+        return MeshValidator.validate(vertices, faces, volume_bounds, normals)
+
+# ============================================================================
+# RENDU DES APERÇUS
+# ============================================================================
+class PreviewRenderer:
+    """Classe pour rendre les aperçus en PNG (sans pyplot, utilisable en tâche de fond)"""
+
+    @staticmethod
+    def to_png(fig, **kwargs):
+        """Encode une figure matplotlib en PNG"""
+        buf = BytesIO()
+        fig.savefig(buf, format='png', **kwargs)
+        return buf.getvalue()
+
+    @staticmethod
+    def dimensions_png(properties):
+        """Diagramme en barres des diamètres principaux (onglet 1)"""
+        fig1 = Figure(figsize=(10, 6))
+        ax1 = fig1.add_subplot()
+
+        diameters = [
+            properties['diametres']['primitif'],
+            properties['diametres']['externe'],
+            properties['diametres']['fond']
+        ]
+        labels = ['Primitif', 'Externe', 'Fond']
+        colors = ['#1E3A8A', '#3B82F6', '#60A5FA']
+
+        bars = ax1.bar(labels, diameters, color=colors, edgecolor='black')
+        ax1.set_ylabel('Diamètre (mm)', fontsize=12)
+        ax1.set_title('Dimensions principales de l\'engrenage', fontsize=14, fontweight='bold')
+
+        # Ajouter les valeurs sur les barres
+        for bar, value in zip(bars, diameters):
+            height = bar.get_height()
+            ax1.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                     f'{value:.1f} mm', ha='center', va='bottom', fontweight='bold')
+
+        ax1.grid(True, alpha=0.3, axis='y')
+        return PreviewRenderer.to_png(fig1, dpi=120, bbox_inches='tight')
+
+    @staticmethod
+    def preview_png(properties, coarse_mesh, thickness, hub_diameter):
+        """Vues de face, de côté, 3D et distribution de force"""
+        fig2 = Figure(figsize=(12, 10))
+        ax2 = fig2.add_subplot(2, 2, 1)
+        ax3 = fig2.add_subplot(2, 2, 2)
+        ax4 = fig2.add_subplot(2, 2, 3, projection='3d')
+        ax5 = fig2.add_subplot(2, 2, 4)
+        coarse_outline = coarse_mesh["contour"]
+
+        # Vue de face
+        theta = np.linspace(0, 2*np.pi, 1000)
+        pitch_radius = properties['diametres']['primitif'] / 2
+        outer_radius = properties['diametres']['externe'] / 2
+        base_radius = properties['diametres']['base'] / 2
+        root_radius = properties['diametres']['fond'] / 2
+
+        # Vue de face complète
+        ax2.plot(outer_radius * np.cos(theta), outer_radius * np.sin(theta), 'b-', linewidth=3, label='Externe')
+        ax2.plot(pitch_radius * np.cos(theta), pitch_radius * np.sin(theta), 'r--', linewidth=2, label='Primitif')
+        ax2.plot(base_radius * np.cos(theta), base_radius * np.sin(theta), 'g-.', linewidth=1, label='Base')
+        ax2.plot(root_radius * np.cos(theta), root_radius * np.sin(theta), 'k:', linewidth=1, label='Fond')
+
+        # Contour réel des dents (niveau grossier)
+        ax2.fill(coarse_outline[:, 0], coarse_outline[:, 1], color='lightblue',
+                 alpha=0.5, edgecolor='black', linewidth=1, label='Denture')
+
+        ax2.set_aspect('equal')
+        ax2.set_title('Vue de face', fontweight='bold')
+        ax2.legend(loc='upper right')
+        ax2.grid(True, alpha=0.3)
+
+        # Vue de côté
+        x_side = [-thickness/2, thickness/2]
+        y_outer = [outer_radius, outer_radius]
+        y_root = [root_radius, root_radius]
+
+        ax3.fill_between(x_side, y_root, y_outer, color='lightblue', alpha=0.5)
+        ax3.plot(x_side, y_outer, 'b-', linewidth=3, label='Externe')
+        ax3.plot(x_side, y_root, 'k-', linewidth=1, label='Fond')
+
+        # Ajouter le moyeu
+        if hub_diameter > 0:
+            y_hub = [hub_diameter/2, hub_diameter/2]
+            ax3.plot(x_side, y_hub, 'r-', linewidth=2, label='Moyeu')
+
+        ax3.set_xlabel('Axe longitudinal (mm)')
+        ax3.set_ylabel('Rayon (mm)')
+        ax3.set_title('Vue de côté', fontweight='bold')
+        ax3.legend()
+        ax3.grid(True, alpha=0.3)
+        ax3.set_aspect('auto')
+
+        # Vue isométrique (niveau grossier)
+        vertices_3d = coarse_mesh["sommets"]
+        ax4.plot_trisurf(vertices_3d[:, 0], vertices_3d[:, 1], vertices_3d[:, 2] - thickness/2,
+                         triangles=coarse_mesh["faces"], color='lightblue', alpha=0.8,
+                         linewidth=0, antialiased=False)
+        ax4.set_xlabel('X')
+        ax4.set_ylabel('Y')
+        ax4.set_zlabel('Z')
+        ax4.set_title('Vue 3D', fontweight='bold')
+        ax4.view_init(elev=20, azim=45)
+
+        # Diagramme des forces
+        angles = np.linspace(0, 2*np.pi, 8)
+        forces = np.abs(np.sin(angles)) * 100  # Simulation de forces
+
+        ax5.bar(range(len(angles)), forces, color='orange', edgecolor='darkorange')
+        ax5.set_xlabel('Position angulaire')
+        ax5.set_ylabel('Force (N)')
+        ax5.set_title('Distribution de force sur les dents', fontweight='bold')
+        ax5.grid(True, alpha=0.3)
+
+        fig2.tight_layout()
+        return PreviewRenderer.to_png(fig2, dpi=120, bbox_inches='tight')
+
+    @staticmethod
+    def rotation_frames(coarse_outline, outer_radius, count=12):
+        """Images PNG du contour grossier tourné sur un tour complet"""
+        frames = []
+        closed_outline = np.vstack((coarse_outline, coarse_outline[:1]))
+        for angle in np.linspace(0, 2*np.pi, count):
+            fig_anim = Figure(figsize=(4, 4))
+            ax_anim = fig_anim.add_subplot()
+            ax_anim.plot(np.cos(angle) * closed_outline[:, 0] - np.sin(angle) * closed_outline[:, 1],
+                         np.sin(angle) * closed_outline[:, 0] + np.cos(angle) * closed_outline[:, 1],
+                         'b-', linewidth=2)
+            ax_anim.set_aspect('equal')
+            ax_anim.axis('off')
+            ax_anim.set_xlim(-outer_radius*1.2, outer_radius*1.2)
+            ax_anim.set_ylim(-outer_radius*1.2, outer_radius*1.2)
+            frames.append(PreviewRenderer.to_png(fig_anim, dpi=100, bbox_inches='tight', pad_inches=0))
+        return frames
+
+    @staticmethod
+    def sensitivity_png(label, values, current, curves):
+        """Courbes de sensibilité des propriétés le long d'un curseur"""
+        fig = Figure(figsize=(12, 8))
+        axes = fig.subplots(2, 2, sharex=True)
+        panels = [
+            (axes[0, 0], "Rapport de contact", [("rapport_contact", "Rapport de contact", '#1E3A8A')]),
+            (axes[0, 1], "Diamètres [mm]", [("externe", "Externe", '#3B82F6'), ("fond", "Fond", '#F97316')]),
+            (axes[1, 0], "Masse [kg]", [("masse", "Masse (acier)", '#10B981')]),
+            (axes[1, 1], "Hauteur de dent [mm]", [("hauteur", "Hauteur", '#8B5CF6')])
+        ]
+
+        for ax, ylabel, series in panels:
+            for key, name, color in series:
+                ax.plot(values, curves[key], color=color, linewidth=2, label=name,
+                        marker='o' if len(values) <= 10 else None)
+            ax.axvline(current, color='red', linestyle='--', linewidth=1, label='Valeur actuelle')
+            ax.set_ylabel(ylabel)
+            ax.grid(True, alpha=0.3)
+            ax.legend(loc='upper left', fontsize=8)
+        axes[0, 0].axhline(1.2, color='gray', linestyle=':', linewidth=1)
+        for ax in axes[1]:
+            ax.set_xlabel(label)
+
+        fig.suptitle(f"Sensibilité des propriétés : {label}", fontsize=14, fontweight='bold')
+        fig.subplots_adjust(left=0.07, right=0.98, bottom=0.08, top=0.92, wspace=0.2, hspace=0.08)
+        return PreviewRenderer.to_png(fig, dpi=100)
+
+# ============================================================================
+# CATALOGUE PRÉCALCULÉ (REQUÊTES PAR PLAGES)
+# ============================================================================
+# Grille des curseurs de la sidebar. L'épaisseur est factorisée (volume
+# stocké par mm d'épaisseur) et le moyeu n'intervient pas dans les calculs
+CATALOG_GRID = {
+    "module": np.arange(0.5, 20.0 + 0.25, 0.5),
+    "dents": np.arange(8, 201),
+    "angle_pression": np.array([14.5, 17.5, 20.0, 22.5, 25.0]),
+    "alesage": np.arange(0.0, 50.0 + 0.25, 0.5)
+}
+
+# Colonnes stockées (un fichier .npy par colonne, ouvert en np.memmap)
+CATALOG_COLUMNS = {
+    "module": "<f4",
+    "dents": "<i2",
+    "angle_pression": "<f4",
+    "alesage": "<f4",
+    "primitif": "<f4",
+    "externe": "<f4",
+    "base": "<f4",
+    "fond": "<f4",
+    "hauteur": "<f4",
+    "rapport_contact": "<f4",
+    "volume_par_mm": "<f4"
+}
+
+# Colonnes munies d'un index trié (permutation int32) pour la bissection
+CATALOG_INDEXED = ("module", "dents", "alesage", "externe", "fond",
+                   "rapport_contact", "volume_par_mm")
+
+# Les fichiers sont reconstruits quand la version change
+CATALOG_VERSION = 2
+
+
+class GearCatalog:
+    """Catalogue colonnaire de toute la grille de paramètres, interrogé par plages"""
+
+    @staticmethod
+    def default_directory():
+        """Répertoire du catalogue (GEAR_CATALOG_DIR ou dossier temporaire)"""
+        parent = os.environ.get("GEAR_CATALOG_DIR", tempfile.gettempdir())
+        return os.path.join(parent, f"gear_catalog_v{CATALOG_VERSION}")
+
+    @staticmethod
+    def _module_rows(module_value, grid):
+        """Lignes valides (alésage maillable, voir GearMesh) pour un module donné"""
+        teeth, angles, bores = np.meshgrid(
+            grid["dents"], grid["angle_pression"], grid["alesage"], indexing="ij"
+        )
+        valid = bores < GearMesh.max_bore_diameter(module_value, teeth)
+        return teeth[valid], angles[valid], bores[valid]
+
+    @staticmethod
+    def build(directory, grid=CATALOG_GRID):
+        """Précalcule la grille module par module directement dans les fichiers"""
+        # Nombre de lignes connu d'avance pour préallouer les colonnes
+        bores = np.sort(grid["alesage"])
+        total = sum(
+            int(np.searchsorted(bores, GearMesh.max_bore_diameter(m, grid["dents"])).sum())
+            * len(grid["angle_pression"])
+            for m in grid["module"]
+        )
+
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".gear_catalog_", dir=parent)
+        try:
+            columns = {
+                name: np.lib.format.open_memmap(
+                    os.path.join(staging, f"{name}.npy"), mode="w+", dtype=dtype, shape=(total,)
+                )
+                for name, dtype in CATALOG_COLUMNS.items()
+            }
+
+            start = 0
+            for module_value in grid["module"]:
+                teeth, angles, bore_values = GearCatalog._module_rows(module_value, grid)
+                props = GearCalculator.calculate_arrays(
+                    module_value, teeth, angles, 1.0, 0, bore_values
+                )
+                stop = start + len(teeth)
+                rows = slice(start, stop)
+                columns["module"][rows] = module_value
+                columns["dents"][rows] = teeth
+                columns["angle_pression"][rows] = angles
+                columns["alesage"][rows] = bore_values
+                columns["volume_par_mm"][rows] = props["volume"]
+                for name in ("primitif", "externe", "base", "fond", "hauteur", "rapport_contact"):
+                    columns[name][rows] = props[name]
+                start = stop
+
+            for name in CATALOG_INDEXED:
+                order = np.lib.format.open_memmap(
+                    os.path.join(staging, f"index_{name}.npy"), mode="w+", dtype="<i4", shape=(total,)
+                )
+                order[:] = np.argsort(columns[name], kind="stable")
+                order.flush()
+                del order
+            for column in columns.values():
+                column.flush()
+            del columns
+
+            # Publication atomique : un autre processus a pu finir avant nous
+            try:
+                os.rename(staging, directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+                shutil.rmtree(staging, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def load(directory=None, grid=CATALOG_GRID):
+        """Ouvre le catalogue en np.memmap, après l'avoir construit si besoin"""
+        directory = directory or GearCatalog.default_directory()
+        if not os.path.isdir(directory):
+            GearCatalog.build(directory, grid)
+
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in CATALOG_COLUMNS
+        }
+        index = {
+            name: np.load(os.path.join(directory, f"index_{name}.npy"), mmap_mode="r")
+            for name in CATALOG_INDEXED
+        }
+        return {
+            "repertoire": directory,
+            "taille": len(columns["module"]),
+            "colonnes": columns,
+            "index": index
+        }
+
+    @staticmethod
+    def bound_position(column, order, value, side="left"):
+        """Bissection dans column[order] sans matérialiser la colonne triée"""
+        value = column.dtype.type(value)
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = column[order[mid]]
+            if current < value or (side == "right" and current == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def query(catalog, bounds, allowed=None):
+        """
+        Retourne les lignes vérifiant toutes les plages {colonne: (min, max)}
+        (None = borne ouverte) et les listes de valeurs permises {colonne: [...]}.
+        La plage indexée la plus sélective fournit les candidats, filtrés ensuite
+        par masques sur les autres critères.
+        """
+        columns, index = catalog["colonnes"], catalog["index"]
+        ranges, masks = [], []
+        for name, (low, high) in bounds.items():
+            if low is None and high is None:
+                continue
+            if name in index:
+                order = index[name]
+                start = 0 if low is None else GearCatalog.bound_position(columns[name], order, low, "left")
+                stop = len(order) if high is None else GearCatalog.bound_position(columns[name], order, high, "right")
+                ranges.append((max(stop - start, 0), name, start, stop))
+            else:
+                masks.append((name, low, high))
+
+        if ranges:
+            _, driver, start, stop = min(ranges)
+            rows = np.sort(index[driver][start:stop])
+            masks += [(name, bounds[name][0], bounds[name][1]) for _, name, _, _ in ranges if name != driver]
+        else:
+            rows = np.arange(catalog["taille"])
+
+        for name, low, high in masks:
+            if len(rows) == 0:
+                break
+            values = columns[name][rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if low is not None:
+                keep &= values >= columns[name].dtype.type(low)
+            if high is not None:
+                keep &= values <= columns[name].dtype.type(high)
+            rows = rows[keep]
+
+        for name, values in (allowed or {}).items():
+            rows = rows[np.isin(columns[name][rows], np.asarray(values, dtype=columns[name].dtype))]
+        return rows
+
+    @staticmethod
+    def rows_table(catalog, rows, thickness):
+        """Colonnes des lignes retenues, masse recalculée pour l'épaisseur donnée"""
+        table = {name: np.asarray(column[rows]) for name, column in catalog["colonnes"].items()}
+        volume = table.pop("volume_par_mm").astype(float) * thickness
+        table["volume"] = volume
+        table["masse"] = volume * 7.85e-6
+        return table
+
+
+@st.cache_resource(show_spinner="Construction du catalogue…")
+def load_gear_catalog():
+    """Catalogue partagé par toutes les sessions (construit une fois sur disque)"""
+    return GearCatalog.load()
+
+
+def load_catalog_row(row):
+    """Reporte une ligne du catalogue sur les curseurs de la sidebar"""
+    columns = load_gear_catalog()["colonnes"]
+    st.session_state["module"] = float(columns["module"][row])
+    st.session_state["teeth"] = int(columns["dents"][row])
+    st.session_state["pressure_angle"] = float(columns["angle_pression"][row])
+    st.session_state["bore_diameter"] = float(columns["alesage"][row])
+    st.session_state["preset"] = CUSTOM_PRESET
+
+# ============================================================================
+# FONCTIONS EN CACHE (NIVEAUX DE DÉTAIL PARTAGÉS)
+# ============================================================================
+# Assez d'entrées pour conserver toute la grille de préréglages préchauffée
+CACHE_MAX_ENTRIES = 512
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_fine_outline(module, teeth, pressure_angle, backlash):
+    """Contour fin, calculé une seule fois par jeu de paramètres"""
+    return GearProfile.generate_outline(
+        module, teeth, pressure_angle, backlash, FINE_POINTS_PER_FLANK
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_properties(module, teeth, pressure_angle, thickness, hub_diameter,
+                      bore_diameter):
+    """Propriétés géométriques et physiques (onglets 1 à 4)"""
+    return GearCalculator.calculate_all_properties(
+        module, teeth, pressure_angle, thickness, hub_diameter, bore_diameter
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_gear_mesh(module, teeth, pressure_angle, thickness, bore_diameter,
+                     backlash, level):
+    """Maillage d'un niveau de détail, dérivé du contour fin en cache
+
+    L'aperçu ne demande que le niveau grossier ; le niveau fin n'est
+    construit qu'à l'export, puis réutilisé.
+    """
+    outline = cached_fine_outline(module, teeth, pressure_angle, backlash)
+    return GearMesh.build(outline, module, teeth, thickness, bore_diameter, level)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_meshing_check(module, teeth, mate_teeth, pressure_angle, backlash):
+    """Vérification d'engrènement avec la roue conjuguée"""
+    return MeshingChecker.check_mesh(module, teeth, mate_teeth, pressure_angle, backlash)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_dimensions_png(module, teeth, pressure_angle):
+    """Diagramme des diamètres (onglet 1) en PNG"""
+    properties = GearCalculator.calculate_all_properties(module, teeth, pressure_angle, 1.0)
+    return PreviewRenderer.dimensions_png(properties)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_preview_png(module, teeth, pressure_angle, thickness, hub_diameter,
+                       bore_diameter, backlash):
+    """Figure de prévisualisation (onglet 3) en PNG"""
+    properties = cached_properties(module, teeth, pressure_angle, thickness,
+                                   hub_diameter, bore_diameter)
+    coarse_mesh = cached_gear_mesh(module, teeth, pressure_angle, thickness,
+                                   bore_diameter, backlash, "grossier")
+    return PreviewRenderer.preview_png(properties, coarse_mesh, thickness, hub_diameter)
+
+
+# Curseurs balayables : paramètre de calculate_arrays -> (libellé, valeurs)
+SENSITIVITY_SWEEPS = {
+    "teeth": ("Nombre de dents (z)", CATALOG_GRID["dents"]),
+    "module": ("Module (m) [mm]", CATALOG_GRID["module"]),
+    "pressure_angle": ("Angle de pression (α) [°]", CATALOG_GRID["angle_pression"]),
+    "thickness": ("Épaisseur (b) [mm]", np.arange(1.0, 100.0 + 0.5, 1.0)),
+    "bore_diameter": ("Diamètre d'alésage [mm]", CATALOG_GRID["alesage"])
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_sensitivity_png(parameter, module, teeth, pressure_angle, thickness, bore_diameter):
+    """Balayage d'un curseur en une seule évaluation vectorisée, rendu en PNG"""
+    label, values = SENSITIVITY_SWEEPS[parameter]
+    params = {"module": module, "teeth": teeth, "pressure_angle": pressure_angle,
+              "thickness": thickness, "bore_diameter": bore_diameter}
+    current = params[parameter]
+    params[parameter] = values
+    curves = GearCalculator.calculate_arrays(**params)
+    # Alésage plus grand que le diamètre de fond : masse non physique masquée
+    curves["masse"] = np.where(curves["volume"] > 0, curves["masse"], np.nan)
+    return PreviewRenderer.sensitivity_png(label, values, current, curves)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def cached_rotation_frames(module, teeth, pressure_angle, thickness, bore_diameter,
+                           backlash):
+    """Images de l'animation de rotation (niveau grossier)"""
+    coarse_mesh = cached_gear_mesh(module, teeth, pressure_angle, thickness,
+                                   bore_diameter, backlash, "grossier")
+    return PreviewRenderer.rotation_frames(coarse_mesh["contour"], module * teeth / 2 + module)
+
+# ============================================================================
+# PRÉCHAUFFAGE DU CACHE AU DÉMARRAGE
+# ============================================================================
+class CacheWarmer:
+    """Classe pour précalculer les préréglages standard en tâche de fond"""
+
+    STAGES = ("proprietes", "profil", "apercu", "export")
+
+    @staticmethod
+    def preset_grid():
+        """Grille (module, dents) à préchauffer, configurable par variables d'environnement"""
+        def parse(name, default, cast):
+            raw = os.environ.get(name, "").strip()
+            return [cast(v) for v in raw.split(",") if v.strip()] if raw else default
+
+        modules = parse("GEAR_WARMUP_MODULES", STANDARD_MODULES, float)
+        teeth_counts = parse("GEAR_WARMUP_TEETH", COMMON_TEETH, int)
+        return [(m, z) for m in modules for z in teeth_counts]
+
+    @staticmethod
+    def warm_preset(module, teeth, status):
+        """Remplit le cache pour un préréglage et chronomètre chaque étape"""
+        p = DEFAULT_PARAMETERS
+        stages = {
+            "proprietes": lambda: cached_properties(
+                module, teeth, p["pressure_angle"], p["thickness"],
+                p["hub_diameter"], p["bore_diameter"]),
+            "profil": lambda: cached_gear_mesh(
+                module, teeth, p["pressure_angle"], p["thickness"],
+                p["bore_diameter"], p["backlash"], "grossier"),
+            "apercu": lambda: (
+                cached_dimensions_png(module, teeth, p["pressure_angle"]),
+                cached_preview_png(module, teeth, p["pressure_angle"], p["thickness"],
+                                   p["hub_diameter"], p["bore_diameter"], p["backlash"]),
+                cached_rotation_frames(module, teeth, p["pressure_angle"], p["thickness"],
+                                       p["bore_diameter"], p["backlash"])),
+            "export": lambda: (
+                cached_meshing_check(module, teeth, p["mate_teeth"], p["pressure_angle"],
+                                     p["backlash"]),
+                cached_gear_mesh(module, teeth, p["pressure_angle"], p["thickness"],
+                                 p["bore_diameter"], p["backlash"], "fin"))
+        }
+
+        timings = {}
+        try:
+            for name in CacheWarmer.STAGES:
+                start = time.perf_counter()
+                stages[name]()
+                timings[name] = time.perf_counter() - start
+        except Exception as exc:
+            with status["verrou"]:
+                status["erreurs"].append(f"{preset_label(module, teeth)} : {exc}")
+        with status["verrou"]:
+            for name, duration in timings.items():
+                status["durees"][name].append(duration)
+            status["termines"] += 1
+            if status["termines"] == status["total"]:
+                status["fin"] = time.perf_counter()
+
+    @staticmethod
+    def start(presets, workers):
+        """Lance le préchauffage dans un pool de threads et retourne son état partagé"""
+        status = {
+            "total": len(presets),
+            "termines": 0,
+            "erreurs": [],
+            "durees": {name: [] for name in CacheWarmer.STAGES},
+            "debut": time.perf_counter(),
+            "fin": None,
+            "verrou": threading.Lock()
+        }
+        if workers <= 0 or not presets:
+            status["total"] = 0
+            status["fin"] = status["debut"]
+            return status
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gear-warmup")
+        for module_value, teeth_value in presets:
+            pool.submit(CacheWarmer.warm_preset, module_value, teeth_value, status)
+        pool.shutdown(wait=False)
+        return status
+
+
+@st.cache_resource(show_spinner=False)
+def start_cache_warmup():
+    """Démarre le préchauffage une seule fois par processus serveur"""
+    workers = int(os.environ.get("GEAR_WARMUP_WORKERS", min(4, os.cpu_count() or 1)))
+    return CacheWarmer.start(CacheWarmer.preset_grid(), workers)
 
 # ============================================================================
 # INTERFACE PRINCIPALE
 # ============================================================================
 
-# Initialiser le calculateur
-calculator = GearCalculator()
+# Préchauffage des préréglages (premier lancement du serveur)
+warmup = start_cache_warmup()
+with st.sidebar:
+    # Alésage débouchant dans le fond des dents : aucun maillage possible
+    max_bore = GearMesh.max_bore_diameter(module, teeth)
+    bore_fits = bore_diameter < max_bore
+    if not bore_fits:
+        st.error(f"❌ Alésage trop grand : {max_bore:.2f} mm au maximum pour "
+                 f"m = {module:g} mm et z = {teeth}")
+    
+    # Jeu trop grand pour l'épaisseur de dent : dents sans matière ou pointues
+    tooth_error = GearProfile.tooth_error(module, teeth, pressure_angle, backlash)
+    if tooth_error:
+        st.error(f"❌ Jeu incompatible : {tooth_error}")
+    
+    with st.expander("🔥 Préchauffage du cache", expanded=False):
+        with warmup["verrou"]:
+            done = warmup["termines"]
+            elapsed = (warmup["fin"] or time.perf_counter()) - warmup["debut"]
+            stage_means = {name: (np.mean(d) * 1000 if d else 0.0)
+                           for name, d in warmup["durees"].items()}
+            errors = list(warmup["erreurs"])
+        
+        if warmup["total"] == 0:
+            st.caption("Préchauffage désactivé")
+        else:
+            st.progress(done / warmup["total"],
+                        text=f"{done}/{warmup['total']} préréglages en {elapsed:.1f} s")
+            st.caption(" · ".join(f"{name} : {mean:.0f} ms" for name, mean in stage_means.items()))
+            for error in errors:
+                st.warning(error)
 
 # Créer des onglets pour l'interface
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "📊 Vue d'ensemble", 
     "📐 Calculs détaillés", 
     "👁️ Prévisualisation", 
-    "📁 Export"
+    "📁 Export",
+    "🔁 Train d'engrenages",
+    "🔎 Catalogue"
 ])
 
 with tab1:
     # Calculer les propriétés
-    properties = calculator.calculate_all_properties(
+    properties = cached_properties(
         module, teeth, pressure_angle, thickness,
         hub_diameter, bore_diameter
     )
@@ -544,28 +2158,7 @@ with tab1:
     st.markdown('<div class="gear-animation">⚙️</div>', unsafe_allow_html=True)
     
     # Graphique des dimensions
-    fig1, ax1 = plt.subplots(figsize=(10, 6))
-    
-    diameters = [
-        properties['diametres']['primitif'],
-        properties['diametres']['externe'],
-        properties['diametres']['fond']
-    ]
-    labels = ['Primitif', 'Externe', 'Fond']
-    colors = ['#1E3A8A', '#3B82F6', '#60A5FA']
-    
-    bars = ax1.bar(labels, diameters, color=colors, edgecolor='black')
-    ax1.set_ylabel('Diamètre (mm)', fontsize=12)
-    ax1.set_title('Dimensions principales de l\'engrenage', fontsize=14, fontweight='bold')
-    
-    # Ajouter les valeurs sur les barres
-    for bar, value in zip(bars, diameters):
-        height = bar.get_height()
-        ax1.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                f'{value:.1f} mm', ha='center', va='bottom', fontweight='bold')
-    
-    ax1.grid(True, alpha=0.3, axis='y')
-    st.pyplot(fig1)
+    st.image(cached_dimensions_png(module, teeth, pressure_angle))
 
 with tab2:
     # Section : Calculs détaillés
@@ -612,134 +2205,160 @@ with tab2:
     
     df = pd.DataFrame(data)
     st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    # Vérification d'engrènement avec la roue conjuguée
+    st.markdown("##### 🔗 Vérification d'engrènement")
+    meshing = cached_meshing_check(
+        module, teeth, mate_teeth, pressure_angle, backlash
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Entraxe", f"{meshing['entraxe']:.2f} mm",
+                  delta=f"z = {teeth} / {mate_teeth}", delta_color="off")
+    with col2:
+        st.metric("Jeu de flanc minimal", f"{meshing['jeu_flanc_min']:.3f} mm",
+                  delta=f"Théorique : {meshing['jeu_theorique']:.3f} mm", delta_color="off")
+    with col3:
+        st.metric("Interférence maximale", f"{meshing['interference_max']:.3f} mm")
+    
+    if meshing['valide']:
+        st.success("✅ Engrènement sans interférence sur un cycle complet")
+    elif meshing['erreur']:
+        st.error(f"❌ Denture irréalisable : {meshing['erreur']}")
+    else:
+        st.error("❌ Interférence détectée : augmentez le nombre de dents ou l'angle de pression")
+    
+    st.line_chart(
+        pd.DataFrame({
+            "Jeu de flanc [mm]": meshing['jeu_par_position'],
+            "Interférence [mm]": meshing['interference_par_position']
+        }, index=pd.Index(meshing['angles'], name="Rotation roue 1 [°]"))
+    )
+    
+    # Section : Sensibilité aux paramètres
+    st.markdown("---")
+    st.subheader("📈 Sensibilité aux paramètres")
+    swept = st.selectbox(
+        "Curseur balayé",
+        list(SENSITIVITY_SWEEPS),
+        format_func=lambda name: SENSITIVITY_SWEEPS[name][0],
+        key="sensitivity_parameter",
+        help="Les autres paramètres restent fixés aux valeurs de la sidebar"
+    )
+    st.image(cached_sensitivity_png(swept, module, teeth, pressure_angle, thickness, bore_diameter))
 
 with tab3:
     # Section : Prévisualisation graphique
     st.subheader("👁️ Prévisualisation 2D/3D")
     
-    # Créer une figure avec plusieurs vues
-    fig2, ((ax2, ax3), (ax4, ax5)) = plt.subplots(2, 2, figsize=(12, 10))
-    
-    # Vue de face
-    theta = np.linspace(0, 2*np.pi, 1000)
-    pitch_radius = properties['diametres']['primitif'] / 2
+    # Figure des vues, rendue une fois par jeu de paramètres
+    if bore_fits:
+        st.image(cached_preview_png(module, teeth, pressure_angle, thickness,
+                                    hub_diameter, bore_diameter, backlash))
+    else:
+        st.error(f"❌ Prévisualisation impossible : l'alésage dépasse {max_bore:.2f} mm.")
     outer_radius = properties['diametres']['externe'] / 2
-    base_radius = properties['diametres']['base'] / 2
-    root_radius = properties['diametres']['fond'] / 2
-    
-    # Vue de face complète
-    ax2.plot(outer_radius * np.cos(theta), outer_radius * np.sin(theta), 'b-', linewidth=3, label='Externe')
-    ax2.plot(pitch_radius * np.cos(theta), pitch_radius * np.sin(theta), 'r--', linewidth=2, label='Primitif')
-    ax2.plot(base_radius * np.cos(theta), base_radius * np.sin(theta), 'g-.', linewidth=1, label='Base')
-    ax2.plot(root_radius * np.cos(theta), root_radius * np.sin(theta), 'k:', linewidth=1, label='Fond')
-    
-    # Dessiner quelques dents
-    num_teeth_to_draw = min(teeth, 36)
-    for i in range(num_teeth_to_draw):
-        angle = 2 * np.pi * i / num_teeth_to_draw
-        x1 = pitch_radius * np.cos(angle)
-        y1 = pitch_radius * np.sin(angle)
-        x2 = outer_radius * np.cos(angle)
-        y2 = outer_radius * np.sin(angle)
-        ax2.plot([x1, x2], [y1, y2], 'k-', linewidth=1, alpha=0.7)
-    
-    ax2.set_aspect('equal')
-    ax2.set_title('Vue de face', fontweight='bold')
-    ax2.legend(loc='upper right')
-    ax2.grid(True, alpha=0.3)
-    
-    # Vue de côté
-    x_side = [-thickness/2, thickness/2]
-    y_outer = [outer_radius, outer_radius]
-    y_root = [root_radius, root_radius]
-    
-    ax3.fill_between(x_side, y_root, y_outer, color='lightblue', alpha=0.5)
-    ax3.plot(x_side, y_outer, 'b-', linewidth=3, label='Externe')
-    ax3.plot(x_side, y_root, 'k-', linewidth=1, label='Fond')
-    
-    # Ajouter le moyeu
-    if hub_diameter > 0:
-        y_hub = [hub_diameter/2, hub_diameter/2]
-        ax3.plot(x_side, y_hub, 'r-', linewidth=2, label='Moyeu')
-    
-    ax3.set_xlabel('Axe longitudinal (mm)')
-    ax3.set_ylabel('Rayon (mm)')
-    ax3.set_title('Vue de côté', fontweight='bold')
-    ax3.legend()
-    ax3.grid(True, alpha=0.3)
-    ax3.set_aspect('auto')
-    
-    # Vue isométrique simplifiée
-    u = np.linspace(0, 2 * np.pi, 100)
-    v = np.linspace(-thickness/2, thickness/2, 50)
-    u, v = np.meshgrid(u, v)
-    
-    x_iso = outer_radius * np.cos(u)
-    y_iso = outer_radius * np.sin(u)
-    z_iso = v
-    
-    ax4.plot_surface(x_iso, y_iso, z_iso, alpha=0.6, color='lightblue')
-    ax4.set_xlabel('X')
-    ax4.set_ylabel('Y')
-    ax4.set_zlabel('Z')
-    ax4.set_title('Vue 3D simplifiée', fontweight='bold')
-    ax4.view_init(elev=20, azim=45)
-    
-    # Diagramme des forces
-    angles = np.linspace(0, 2*np.pi, 8)
-    forces = np.abs(np.sin(angles)) * 100  # Simulation de forces
-    
-    ax5.bar(range(len(angles)), forces, color='orange', edgecolor='darkorange')
-    ax5.set_xlabel('Position angulaire')
-    ax5.set_ylabel('Force (N)')
-    ax5.set_title('Distribution de force sur les dents', fontweight='bold')
-    ax5.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    st.pyplot(fig2)
+    
+    # Vue 3D interactive (niveau moyen), construite seulement à la demande
+    if bore_fits and st.checkbox("🧊 Vue 3D détaillée", value=False):
+        col_elev, col_azim = st.columns(2)
+        with col_elev:
+            elevation = st.slider("Élévation [°]", min_value=-90, max_value=90, value=25, step=5)
+        with col_azim:
+            azimuth = st.slider("Azimut [°]", min_value=0, max_value=360, value=45, step=5)
+        
+        medium_mesh = cached_gear_mesh(module, teeth, pressure_angle, thickness,
+                                       bore_diameter, backlash, "moyen")
+        fig3d = plt.figure(figsize=(8, 8))
+        ax3d = fig3d.add_subplot(projection='3d')
+        vertices_3d = medium_mesh["sommets"]
+        ax3d.plot_trisurf(vertices_3d[:, 0], vertices_3d[:, 1], vertices_3d[:, 2],
+                          triangles=medium_mesh["faces"], color='steelblue',
+                          linewidth=0, antialiased=False, shade=True)
+        ax3d.set_box_aspect((1, 1, max(thickness / (2 * outer_radius), 0.05)))
+        ax3d.view_init(elev=elevation, azim=azimuth)
+        ax3d.set_axis_off()
+        st.pyplot(fig3d)
+        plt.close(fig3d)
+        st.caption(f"Niveau moyen : {len(medium_mesh['faces'])} triangles")
     
     # Animation simple
     st.markdown("##### 🎬 Animation de rotation")
-    frames = []
-    for angle in np.linspace(0, 2*np.pi, 12):
-        fig_anim, ax_anim = plt.subplots(figsize=(4, 4))
-        ax_anim.plot(outer_radius * np.cos(theta + angle), 
-                    outer_radius * np.sin(theta + angle), 'b-', linewidth=2)
-        ax_anim.set_aspect('equal')
-        ax_anim.axis('off')
-        ax_anim.set_xlim(-outer_radius*1.2, outer_radius*1.2)
-        ax_anim.set_ylim(-outer_radius*1.2, outer_radius*1.2)
-        
-        # Convertir en image
-        buf = BytesIO()
-        fig_anim.savefig(buf, format='png', dpi=100, bbox_inches='tight', pad_inches=0)
-        buf.seek(0)
-        frames.append(buf)
-        plt.close(fig_anim)
-    
-    # Afficher les frames comme une animation simple
-    cols = st.columns(4)
-    for i, frame in enumerate(frames[:4]):
-        with cols[i]:
-            st.image(frame, caption=f"Position {i+1}")
+    if bore_fits:
+        frames = cached_rotation_frames(module, teeth, pressure_angle, thickness,
+                                        bore_diameter, backlash)
+        
+        # Afficher les frames comme une animation simple
+        cols = st.columns(4)
+        for i, frame in enumerate(frames[:4]):
+            with cols[i]:
+                st.image(frame, caption=f"Position {i+1}")
 
 with tab4:
     # Section : Export des fichiers
     st.subheader("📁 Export des fichiers CAD")
     
-    if generate_button:
+    stl_format = st.radio(
+        "Format STL",
+        ["Binaire", "ASCII"],
+        horizontal=True,
+        help="Le STL binaire est écrit sur disque par blocs : recommandé pour les grands maillages"
+    )
+    
+    if generate_button and not bore_fits:
+        st.error(f"❌ Export bloqué : l'alésage dépasse {max_bore:.2f} mm, diamètre maximal pour ce fond de dent.")
+    elif generate_button and tooth_error:
+        st.error(f"❌ Export bloqué : {tooth_error}.")
+    elif generate_button and meshing['erreur']:
+        st.error(f"❌ Export bloqué : roue conjuguée irréalisable, {meshing['erreur']}.")
+    elif generate_button and not meshing['valide']:
+        st.error("❌ Export bloqué : les deux roues interfèrent (voir l'onglet Calculs détaillés).")
+    elif generate_button:
         with st.spinner("🔄 Génération des fichiers en cours..."):
             
             # Créer les fichiers
+            # Non mis en cache : l'en-tête STEP porte l'heure de l'export
             step_content = StepGenerator.create_step_file(
                 module, teeth, pressure_angle, thickness,
                 hub_diameter, bore_diameter, backlash
             )
             
-            stl_content = StepGenerator.create_stl_preview(module, teeth, thickness)
+            # Relecture du fichier STEP : structure, références et paramètres
+            step_check = StepReader.validate(
+                BytesIO(step_content.encode("utf-8")),
+                StepGenerator.stored_parameters(module, teeth, pressure_angle, thickness)
+            )
             
-            # Créer un fichier de rapport
-            report_content = f"""RAPPORT D'ENGRENAGE - SPUR GEAR
+            # Le niveau fin est construit une fois puis réutilisé par les exports
+            fine_mesh = cached_gear_mesh(module, teeth, pressure_angle, thickness,
+                                         bore_diameter, backlash, "fin")
+            stl_path = None
+            try:
+                if stl_format == "Binaire":
+                    # Écrit sur disque par blocs (mémoire bornée) ; le bouton de
+                    # téléchargement recopie toutefois le fichier en mémoire
+                    with tempfile.NamedTemporaryFile(prefix="gear_", suffix=".stl", delete=False) as tmp:
+                        stl_path = tmp.name
+                    StepGenerator.write_stl_binary(stl_path, module, teeth, fine_mesh)
+                else:
+                    stl_content = StepGenerator.create_stl_file(module, teeth, fine_mesh)
+            
+                # Contrôle du maillage avant livraison : étanchéité, orientation,
+                # facettes dégénérées, volume encadré par les couronnes du calculateur.
+                # Le maillage indexé en cache est celui qui a été écrit ; du STL
+                # binaire, seule la taille est relue, sans recopier les facettes.
+                volume_bounds = MeshValidator.volume_bounds(module, teeth, pressure_angle,
+                                                            thickness, bore_diameter)
+                stl_error = MeshValidator.stl_size_error(stl_path)[1] if stl_format == "Binaire" else None
+                if stl_error:
+                    mesh_check = stl_error
+                else:
+                    mesh_check = MeshValidator.validate(fine_mesh["sommets"], fine_mesh["faces"],
+                                                        volume_bounds)
+            
+                # Créer un fichier de rapport
+                report_content = f"""RAPPORT D'ENGRENAGE - SPUR GEAR
 ================================
 Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
@@ -773,61 +2392,324 @@ PERFORMANCE:
 Rapport de contact: {properties['performance']['rapport_contact']:.2f}
 Vitesse linéaire à 1 RPM: {properties['performance']['vitesse_lineaire']:.3f} m/s
 
+ENGRÈNEMENT (roue conjuguée z = {mate_teeth}):
+---------------------------------------------
+Entraxe: {meshing['entraxe']:.3f} mm
+Jeu (backlash): {backlash} mm
+Jeu de flanc minimal: {meshing['jeu_flanc_min']:.4f} mm
+Interférence maximale: {meshing['interference_max']:.4f} mm
+
+CONTRÔLE DU MAILLAGE STL:
+------------------------
+Facettes: {mesh_check['facettes']}
+Arêtes ouvertes: {mesh_check.get('aretes_ouvertes', '-')}
+Arêtes non manifold: {mesh_check.get('aretes_non_manifold', '-')}
+Arêtes mal orientées: {mesh_check.get('aretes_mal_orientees', '-')}
+Triangles dégénérés: {mesh_check.get('triangles_degeneres', '-')}
+Volume du maillage: {mesh_check.get('volume', float('nan')):.0f} mm³
+Maillage valide: {'oui' if mesh_check['valide'] else 'NON'}
+
 INFORMATIONS DE FICHIER:
 -----------------------
 Fichier STEP: spur_gear_m{module}_z{teeth}.step
 Compatibilité: FreeCAD, Fusion 360, SolidWorks, CATIA, etc.
 """
             
-            # Afficher les options de téléchargement
-            st.success("✅ Génération terminée !")
+                # Afficher les options de téléchargement
+                st.success("✅ Génération terminée !")
             
-            col1, col2, col3 = st.columns(3)
+                if step_check['valide']:
+                    st.caption(f"STEP vérifié : {step_check['entites']} entités, "
+                               f"toutes les références #n sont résolues")
+                else:
+                    st.error(
+                        f"❌ Fichier STEP invalide — doublons : {step_check['doublons']}, "
+                        f"références orphelines : {step_check['references_orphelines']}, "
+                        f"paramètres différents : {step_check['parametres_differents']}"
+                    )
             
-            with col1:
-                st.download_button(
-                    label="📥 Télécharger STEP",
-                    data=step_content,
-                    file_name=f"spur_gear_m{module}_z{teeth}.step",
-                    mime="text/plain",
-                    type="primary"
-                )
-                st.caption("Format CAD standard")
+                if mesh_check['valide']:
+                    st.caption(f"STL vérifié : {mesh_check['facettes']} facettes, fermé et 2-manifold, "
+                               f"normales cohérentes, volume {mesh_check['volume']:.0f} mm³ "
+                               f"(estimation du calculateur : {properties['physique']['volume']:.0f} mm³)")
+                elif 'erreur' in mesh_check:
+                    st.error(f"❌ Fichier STL invalide — {mesh_check['erreur']}")
+                else:
+                    st.error(
+                        f"❌ Maillage STL invalide — arêtes ouvertes : {mesh_check['aretes_ouvertes']}, "
+                        f"non manifold : {mesh_check['aretes_non_manifold']}, "
+                        f"mal orientées : {mesh_check['aretes_mal_orientees']}, "
+                        f"triangles dégénérés : {mesh_check['triangles_degeneres']}, "
+                        f"normales inversées : {mesh_check['normales_inversees']}, "
+                        f"volume {mesh_check['volume']:.0f} mm³ hors de "
+                        f"[{volume_bounds[0]:.0f}, {volume_bounds[1]:.0f}] mm³"
+                    )
             
-            with col2:
-                st.download_button(
-                    label="📥 Télécharger STL",
-                    data=stl_content,
-                    file_name=f"spur_gear_m{module}_z{teeth}.stl",
-                    mime="text/plain"
-                )
-                st.caption("Pour impression 3D")
+                col1, col2, col3 = st.columns(3)
             
-            with col3:
-                st.download_button(
-                    label="📄 Télécharger rapport",
-                    data=report_content,
-                    file_name=f"gear_report_m{module}_z{teeth}.txt",
-                    mime="text/plain"
-                )
-                st.caption("Spécifications détaillées")
+                with col1:
+                    st.download_button(
+                        label="📥 Télécharger STEP",
+                        data=step_content,
+                        file_name=f"spur_gear_m{module}_z{teeth}.step",
+                        mime="text/plain",
+                        type="primary",
+                        disabled=not step_check['valide']
+                    )
+                    st.caption("Format CAD standard")
+            
+                with col2:
+                    if stl_format == "Binaire":
+                        with open(stl_path, "rb") as stl_file:
+                            st.download_button(
+                                label="📥 Télécharger STL",
+                                data=stl_file,
+                                file_name=f"spur_gear_m{module}_z{teeth}.stl",
+                                mime="application/octet-stream",
+                                disabled=not mesh_check['valide']
+                            )
+                        st.caption(f"Pour impression 3D ({os.path.getsize(stl_path) / 1e6:.1f} Mo, "
+                                   f"servi depuis la mémoire du serveur)")
+                    else:
+                        st.download_button(
+                            label="📥 Télécharger STL",
+                            data=stl_content,
+                            file_name=f"spur_gear_m{module}_z{teeth}.stl",
+                            mime="text/plain",
+                            disabled=not mesh_check['valide']
+                        )
+                        st.caption("Pour impression 3D")
             
-            # Aperçu du fichier STEP
-            with st.expander("👁️ Aperçu du fichier STEP (premières lignes)"):
-                st.code(step_content[:1000] + "\n...", language="text")
+                with col3:
+                    st.download_button(
+                        label="📄 Télécharger rapport",
+                        data=report_content,
+                        file_name=f"gear_report_m{module}_z{teeth}.txt",
+                        mime="text/plain"
+                    )
+                    st.caption("Spécifications détaillées")
             
-            # Instructions d'import
-            st.info("""
-            **💡 Instructions d'importation:**
-            1. Téléchargez le fichier STEP
-            2. Ouvrez votre logiciel CAD (FreeCAD, Fusion 360, SolidWorks, etc.)
-            3. Importez le fichier STEP
-            4. L'engrenage sera disponible comme solide 3D
-            5. Vous pouvez maintenant l'utiliser dans vos assemblages
-            """)
+                # Aperçu du fichier STEP
+                with st.expander("👁️ Aperçu du fichier STEP (premières lignes)"):
+                    st.code(step_content[:1000] + "\n...", language="text")
+            
+                # Instructions d'import
+                st.info("""
+                **💡 Instructions d'importation:**
+                1. Téléchargez le fichier STEP
+                2. Ouvrez votre logiciel CAD (FreeCAD, Fusion 360, SolidWorks, etc.)
+                3. Importez le fichier STEP
+                4. L'engrenage sera disponible comme solide 3D
+                5. Vous pouvez maintenant l'utiliser dans vos assemblages
+                """)
+            finally:
+                # Le STL binaire temporaire est supprimé même en cas d'erreur
+                if stl_path is not None:
+                    os.remove(stl_path)
     else:
         st.info("👈 Ajustez les paramètres dans la sidebar et cliquez sur 'GÉNÉRER L'ENGRENAGE' pour créer vos fichiers.")
 
+with tab5:
+    # Section : Train d'engrenages multi-étages
+    st.subheader("🔁 Simulation d'un train d'engrenages")
+    st.caption("Chaque ligne est un étage : la roue menée partage son arbre avec la roue menante de l'étage suivant.")
+    
+    # Table initialisée une seule fois : les réglages de la sidebar ne
+    # doivent pas effacer les étages saisis par l'utilisateur
+    st.session_state.setdefault("train_stages", pd.DataFrame({
+        "Module [mm]": [module, module],
+        "Z menant": [teeth, 18],
+        "Z mené": [mate_teeth, 54],
+        "Rendement": [0.98, 0.98]
+    }))
+    stages_df = st.data_editor(
+        st.session_state["train_stages"],
+        key="train_stages_editor",
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "Module [mm]": st.column_config.NumberColumn(min_value=0.5, max_value=20.0, step=0.5),
+            "Z menant": st.column_config.NumberColumn(min_value=8, max_value=200, step=1),
+            "Z mené": st.column_config.NumberColumn(min_value=8, max_value=200, step=1),
+            "Rendement": st.column_config.NumberColumn(min_value=0.5, max_value=1.0, step=0.01)
+        }
+    ).dropna()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        input_rpm = st.number_input("Vitesse d'entrée [tr/min]", min_value=1.0, max_value=20000.0, value=1500.0, step=50.0)
+    with col2:
+        input_torque = st.number_input("Couple d'entrée [N·m]", min_value=0.1, max_value=5000.0, value=10.0, step=1.0)
+    with col3:
+        duration = st.number_input("Durée [s]", min_value=0.1, max_value=60.0, value=2.0, step=0.1)
+    with col4:
+        ramp_time = st.number_input("Montée en vitesse [s]", min_value=0.0, max_value=60.0, value=0.5, step=0.1)
+    
+    if len(stages_df) == 0:
+        st.info("Ajoutez au moins un étage pour lancer la simulation.")
+    else:
+        stages = [
+            {
+                "module": float(row["Module [mm]"]),
+                "z_menant": int(row["Z menant"]),
+                "z_mene": int(row["Z mené"]),
+                "angle_pression": pressure_angle,
+                "rendement": float(row["Rendement"])
+            }
+            for _, row in stages_df.iterrows()
+        ]
+        
+        # Profil de vitesse : rampe linéaire puis régime établi
+        sim_time = np.linspace(0, duration, 5000)
+        ramp = np.clip(sim_time / ramp_time, 0, 1) if ramp_time > 0 else np.ones_like(sim_time)
+        train = GearTrain.simulate(stages, sim_time, input_rpm * ramp, input_torque)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Rapport global", f"{train['rapport_global']:.3f}")
+        with col2:
+            st.metric("Rendement global", f"{train['rendement_global'] * 100:.1f} %")
+        with col3:
+            st.metric("Vitesse de sortie", f"{abs(train['arbres']['vitesse'][-1, -1]):.1f} tr/min")
+        
+        shafts = train['arbres']
+        meshes = train['engrenements']
+        st.markdown("##### 📋 Régime établi par étage")
+        st.dataframe(pd.DataFrame({
+            "Étage": [f"{i + 1} ({s['z_menant']}/{s['z_mene']})" for i, s in enumerate(stages)],
+            "Vitesse sortie [tr/min]": np.abs(shafts['vitesse'][1:, -1]).round(2),
+            "Couple sortie [N·m]": shafts['couple'][1:, -1].round(2),
+            "Vitesse primitive [m/s]": meshes['vitesse_primitive'][:, -1].round(3),
+            "Effort tangentiel [N]": meshes['effort_tangentiel'][:, -1].round(1),
+            "Effort radial [N]": meshes['effort_radial'][:, -1].round(1)
+        }), use_container_width=True, hide_index=True)
+        
+        # Courbes sous-échantillonnées pour l'affichage
+        every = max(len(sim_time) // 500, 1)
+        st.line_chart(pd.DataFrame(
+            np.abs(shafts['vitesse'][:, ::every]).T,
+            columns=[f"Arbre {i}" for i in range(len(stages) + 1)],
+            index=pd.Index(sim_time[::every], name="Temps [s]")
+        ))
+        
+        # Animation diffusée image par image dans un conteneur unique
+        st.markdown("##### 🎬 Animation du train")
+        if st.button("▶️ Lancer l'animation", use_container_width=True):
+            driver_centers, driven_centers = GearTrain.layout(stages)
+            driver_angles, driven_angles = GearTrain.gear_angles(stages, shafts['angle'])
+            driver_outlines = [GearProfile.generate_outline(s["module"], s["z_menant"], pressure_angle, points_per_flank=8) for s in stages]
+            driven_outlines = [GearProfile.generate_outline(s["module"], s["z_mene"], pressure_angle, points_per_flank=8) for s in stages]
+            extent = max(s["module"] * (max(s["z_menant"], s["z_mene"]) + 2) / 2 for s in stages)
+            width = driven_centers[-1, 0] + 2.2 * extent
+            height = -driven_centers[-1, 1] + 2.2 * extent
+            
+            placeholder = st.empty()
+            progress = st.progress(0.0)
+            frame_indices = np.linspace(0, len(sim_time) - 1, 60).astype(int)
+            for n, k in enumerate(frame_indices):
+                fig_train, ax_train = plt.subplots(figsize=(10, min(max(10 * height / width, 3), 12)))
+                # Arbres intermédiaires : la roue menée d'un étage et la roue
+                # menante du suivant sont reliées par un trait d'axe
+                for i in range(1, len(stages)):
+                    ax_train.plot([driven_centers[i - 1, 0], driver_centers[i, 0]],
+                                  [driven_centers[i - 1, 1], driver_centers[i, 1]],
+                                  color='gray', linestyle='-.', linewidth=1)
+                for i in range(len(stages)):
+                    for outline, center, angle, color in (
+                        (driver_outlines[i], driver_centers[i], driver_angles[i, k], '#1E3A8A'),
+                        (driven_outlines[i], driven_centers[i], driven_angles[i, k], '#F97316')
+                    ):
+                        c, s_ = math.cos(angle), math.sin(angle)
+                        ax_train.fill(center[0] + c * outline[:, 0] - s_ * outline[:, 1],
+                                      center[1] + s_ * outline[:, 0] + c * outline[:, 1],
+                                      color=color, alpha=0.5, edgecolor='black', linewidth=0.5)
+                ax_train.set_aspect('equal')
+                ax_train.set_xlim(-extent * 1.1, driven_centers[-1, 0] + extent * 1.1)
+                ax_train.set_ylim(driven_centers[-1, 1] - extent * 1.1, extent * 1.1)
+                ax_train.axis('off')
+                ax_train.set_title(f"t = {sim_time[k]:.2f} s", fontweight='bold')
+                placeholder.pyplot(fig_train)
+                plt.close(fig_train)
+                progress.progress((n + 1) / len(frame_indices))
+
+with tab6:
+    # Section : Recherche multicritère dans le catalogue précalculé
+    st.subheader("🔎 Catalogue des engrenages standard")
+    st.caption("Toute la grille des curseurs (module, dents, angle de pression, alésage) "
+               "précalculée une fois sur disque ; la masse suit l'épaisseur de la sidebar.")
+    
+    catalog_built = os.path.isdir(GearCatalog.default_directory())
+    if not catalog_built and not st.button("🗂️ Construire le catalogue", use_container_width=True):
+        st.info("Le catalogue n'a pas encore été construit sur ce serveur (quelques secondes, une seule fois).")
+    else:
+        catalog = load_gear_catalog()
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            outer_min = st.number_input("Diamètre externe min [mm]", min_value=0.0, value=40.0, step=1.0, key="cat_outer_min")
+            outer_max = st.number_input("Diamètre externe max [mm]", min_value=0.0, value=60.0, step=1.0, key="cat_outer_max")
+            root_min = st.number_input("Diamètre de fond min [mm]", min_value=0.0, value=0.0, step=1.0, key="cat_root_min")
+        with col2:
+            bore_min = st.number_input("Alésage min [mm]", min_value=0.0, max_value=50.0, value=8.0, step=0.5, key="cat_bore_min")
+            bore_max = st.number_input("Alésage max [mm]", min_value=0.0, max_value=50.0, value=50.0, step=0.5, key="cat_bore_max")
+            contact_min = st.number_input("Rapport de contact min", min_value=1.0, max_value=2.5, value=1.4, step=0.05, key="cat_contact_min")
+        with col3:
+            module_range = st.slider("Module [mm]", 0.5, 20.0, (0.5, 20.0), step=0.5, key="cat_module")
+            teeth_range = st.slider("Nombre de dents", 8, 200, (8, 200), key="cat_teeth")
+            angles = st.multiselect("Angles de pression [°]", [14.5, 17.5, 20.0, 22.5, 25.0],
+                                    default=[20.0], key="cat_angles")
+        mass_max = st.number_input("Masse max [kg] (0 = sans limite)", min_value=0.0, value=0.0, step=0.1, key="cat_mass_max")
+        
+        bounds = {
+            "externe": (outer_min, outer_max),
+            "fond": (root_min or None, None),
+            "alesage": (bore_min, bore_max),
+            "rapport_contact": (contact_min, None),
+            "module": module_range,
+            "dents": teeth_range
+        }
+        if mass_max > 0:
+            # Masse = volume par mm × épaisseur × densité de l'acier
+            bounds["volume_par_mm"] = (None, mass_max / (7.85e-6 * thickness))
+        
+        query_start = time.perf_counter()
+        rows = GearCatalog.query(catalog, bounds, {"angle_pression": angles})
+        query_ms = (time.perf_counter() - query_start) * 1000
+        
+        st.caption(f"{len(rows):,} engrenages sur {catalog['taille']:,} trouvés en {query_ms:.1f} ms".replace(",", " "))
+        
+        if len(rows) == 0:
+            st.info("Aucun engrenage ne satisfait ces critères.")
+        else:
+            shown = rows[:500]
+            table = GearCatalog.rows_table(catalog, shown, thickness)
+            st.dataframe(pd.DataFrame({
+                "Module [mm]": table["module"],
+                "Dents": table["dents"],
+                "α [°]": table["angle_pression"],
+                "Alésage [mm]": table["alesage"],
+                "Ø primitif [mm]": table["primitif"].round(2),
+                "Ø externe [mm]": table["externe"].round(2),
+                "Ø fond [mm]": table["fond"].round(2),
+                "Rapport de contact": table["rapport_contact"].round(3),
+                "Masse [kg]": table["masse"].round(4)
+            }, index=pd.Index(shown, name="Ligne")), use_container_width=True)
+            if len(rows) > len(shown):
+                st.caption(f"Affichage limité aux {len(shown)} premiers résultats : affinez les critères.")
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                hit = st.selectbox(
+                    "Engrenage à charger",
+                    range(len(shown)),
+                    format_func=lambda i: (f"m = {table['module'][i]:g} mm · z = {table['dents'][i]} · "
+                                           f"α = {table['angle_pression'][i]:g}° · alésage {table['alesage'][i]:g} mm"),
+                    key="cat_hit"
+                )
+            with col2:
+                st.button("📥 Charger dans la sidebar", use_container_width=True,
+                          on_click=load_catalog_row, args=(int(shown[hit]),))
+
 # ============================================================================
 # FOOTER ET INFORMATIONS
 # ============================================================================
@@ -0,0 +1,411 @@
+"""
+Test de charge local du générateur d'engrenages.
+
+Simule plusieurs sessions simultanées avec le lanceur de scripts headless de
+Streamlit (streamlit.testing.v1.AppTest) : aucun serveur, navigateur ni
+service externe. Toutes les sessions tournent dans ce processus, comme sur un
+serveur Streamlit (un thread par session, caches st.cache_data partagés).
+
+Chaque session recharge l'application puis enchaîne des interactions
+aléatoires (curseurs, préréglages, vue 3D de l'onglet Prévisualisation,
+sensibilité, export STEP/STL). Le rapport JSON donne, par niveau de
+concurrence et par type d'interaction, les latences p50/p95/p99, ainsi que
+l'utilisation CPU et la mémoire résidente du processus.
+
+AppTest n'est pas prévu pour plusieurs sessions simultanées : chaque relance
+installe puis efface un Runtime factice global, et recompile le script. Le
+harnais conserve donc le dernier Runtime factice et partage un seul cache de
+bytecode entre les sessions, comme le fait le Runtime d'un vrai serveur.
+
+Exemples :
+    python benchmarks/load_test.py --sessions 1 2 4 8 --output rapport.json
+    python benchmarks/load_test.py --sessions 4 --compare rapport_v1.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_VERSION = 1
+
+# Valeurs tirées pour chaque curseur (grilles de la sidebar ; alésage limité
+# à 10 mm, qui reste trop grand pour les plus petites roues : l'application
+# masque alors la prévisualisation, voir SimulatedSession.apply)
+SLIDER_VALUES = {
+    "module": [float(m) for m in np.arange(0.5, 20.25, 0.5)],
+    "teeth": list(range(8, 201)),
+    "pressure_angle": [14.5, 17.5, 20.0, 22.5, 25.0],
+    "thickness": [float(b) for b in range(1, 101)],
+    "bore_diameter": [float(d) for d in np.arange(0.0, 10.25, 0.5)],
+    "backlash": [0.0, 0.05, 0.1, 0.2, 0.5],
+    "mate_teeth": list(range(8, 201))
+}
+
+# Poids des interactions tirées au hasard
+INTERACTION_WEIGHTS = {
+    "curseur": 0.45,
+    "preset": 0.10,
+    "vue_3d": 0.15,
+    "sensibilite": 0.10,
+    "export": 0.20
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+# ============================================================================
+# ADAPTATION D'APPTEST AUX SESSIONS CONCURRENTES
+# ============================================================================
+def share_apptest_runtime():
+    """Rend AppTest utilisable depuis plusieurs threads à la fois
+
+    - Runtime.instance() retombe sur le dernier Runtime factice installé
+      quand une autre session vient de l'effacer en fin de relance ;
+    - toutes les sessions partagent un ScriptCache : le script est compilé
+      une seule fois (ast.parse n'est pas sûr entre threads sous Python 3.11).
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    last_runtime = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime["courant"] = cls._instance
+            return cls._instance
+        if "courant" in last_runtime:
+            return last_runtime["courant"]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or "courant" in last_runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+    shared_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared_cache
+
+
+# ============================================================================
+# MESURE DES RESSOURCES
+# ============================================================================
+def read_rss():
+    """Mémoire résidente actuelle du processus en Mo (pic si /proc absent)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+class ResourceSampler(threading.Thread):
+    """Échantillonne la mémoire résidente et mesure le temps CPU du processus"""
+
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.samples.append(read_rss())
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = os.times()
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.join()
+        self.samples.append(read_rss())
+        cpu_end = os.times()
+        self.wall = time.perf_counter() - self.wall_start
+        self.cpu = ((cpu_end.user - self.cpu_start.user)
+                    + (cpu_end.system - self.cpu_start.system))
+
+    def summary(self):
+        """CPU en cœurs occupés (1.0 = un cœur à 100 %) et RSS en Mo"""
+        return {
+            "cpu": {
+                "temps_s": round(self.cpu, 3),
+                "coeurs_moyens": round(self.cpu / self.wall, 3) if self.wall > 0 else 0.0,
+                "coeurs_disponibles": os.cpu_count()
+            },
+            "rss_mo": {
+                "debut": round(self.samples[0], 1),
+                "moyenne": round(float(np.mean(self.samples)), 1),
+                "pic": round(max(self.samples), 1)
+            }
+        }
+
+
+# ============================================================================
+# SESSIONS SIMULÉES
+# ============================================================================
+class SimulatedSession:
+    """Une session navigateur rejouée par AppTest avec des actions aléatoires"""
+
+    def __init__(self, app_path, rng, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(app_path, default_timeout=timeout)
+        self.rng = rng
+
+    def rerun(self):
+        """Relance le script et retourne (latence en s, nombre d'exceptions)"""
+        start = time.perf_counter()
+        self.app.run()
+        return time.perf_counter() - start, len(self.app.exception)
+
+    @staticmethod
+    def first(elements, predicate):
+        """Premier widget vérifiant predicate, ou None"""
+        return next((element for element in elements if predicate(element)), None)
+
+    @staticmethod
+    def find(elements, predicate, description):
+        """Premier widget vérifiant predicate, ou erreur explicite"""
+        element = SimulatedSession.first(elements, predicate)
+        if element is None:
+            raise LookupError(f"widget introuvable : {description}")
+        return element
+
+    def apply(self, interaction):
+        """Modifie les widgets comme le ferait l'utilisateur pour une interaction"""
+        app, rng = self.app, self.rng
+
+        if interaction == "curseur":
+            key = rng.choice(list(SLIDER_VALUES))
+            widget = app.select_slider(key=key) if key == "pressure_angle" else app.slider(key=key)
+            widget.set_value(rng.choice(SLIDER_VALUES[key]))
+        elif interaction == "preset":
+            presets = app.selectbox(key="preset").options
+            app.selectbox(key="preset").set_value(rng.choice(presets[1:]))
+        elif interaction == "vue_3d":
+            # Alésage trop grand pour la roue courante : pas de vue 3D, la
+            # relance est mesurée sans autre modification
+            view = self.first(app.checkbox, lambda c: "Vue 3D" in c.label)
+            if view is None:
+                return
+            if not view.value:
+                view.check()
+            else:
+                azimuth = self.find(app.slider, lambda s: s.label.startswith("Azimut"), "Azimut")
+                azimuth.set_value(rng.randrange(0, 361, 5))
+        elif interaction == "sensibilite":
+            sweep = app.selectbox(key="sensitivity_parameter")
+            sweep.set_value(rng.choice(sweep.options))
+        elif interaction == "export":
+            stl_format = self.find(app.radio, lambda r: r.label == "Format STL", "Format STL")
+            stl_format.set_value(rng.choice(["Binaire", "ASCII"]))
+            self.find(app.button, lambda b: "GÉNÉRER" in b.label, "Générer").click()
+        else:
+            raise ValueError(f"Interaction inconnue : {interaction}")
+
+    def play(self, interactions, think_time, record):
+        """Chargement initial puis interactions tirées au hasard"""
+        record("chargement", *self.rerun())
+        names = list(INTERACTION_WEIGHTS)
+        weights = list(INTERACTION_WEIGHTS.values())
+        for _ in range(interactions):
+            if think_time > 0:
+                time.sleep(self.rng.expovariate(1 / think_time))
+            interaction = self.rng.choices(names, weights)[0]
+            self.apply(interaction)
+            record(interaction, *self.rerun())
+
+
+def latency_summary(latencies):
+    """Percentiles de latence en millisecondes"""
+    values = np.asarray(latencies) * 1000
+    summary = {"n": len(values)}
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(float(np.percentile(values, p)), 1)
+    summary["max_ms"] = round(float(values.max()), 1)
+    summary["moyenne_ms"] = round(float(values.mean()), 1)
+    return summary
+
+
+def run_level(app_path, sessions, interactions, think_time, seed, timeout):
+    """Joue un niveau de concurrence et retourne ses statistiques"""
+    records = []
+    failures = []
+    lock = threading.Lock()
+
+    def record(interaction, latency, errors):
+        with lock:
+            records.append((interaction, latency, errors))
+
+    def worker(index):
+        try:
+            session = SimulatedSession(app_path, random.Random(seed * 1000 + index), timeout)
+            session.play(interactions, think_time, record)
+        except Exception as exc:
+            with lock:
+                failures.append(f"session {index} : {type(exc).__name__} : {exc}")
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"session-{i}") for i in range(sessions)]
+    with ResourceSampler() as sampler:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    by_type = {}
+    for interaction, latency, _ in records:
+        by_type.setdefault(interaction, []).append(latency)
+    interactive = [latency for name, latency, _ in records if name != "chargement"]
+
+    level = {
+        "sessions": sessions,
+        "duree_s": round(sampler.wall, 2),
+        "interactions": len(interactive),
+        "debit_par_s": round(len(interactive) / sampler.wall, 3) if sampler.wall > 0 else 0.0,
+        "latences": {name: latency_summary(values) for name, values in sorted(by_type.items())},
+        "exceptions_app": int(sum(errors for _, _, errors in records)),
+        "sessions_echouees": failures,
+        **sampler.summary()
+    }
+    if interactive:
+        level["latences"]["toutes"] = latency_summary(interactive)
+    return level
+
+
+# ============================================================================
+# RAPPORT
+# ============================================================================
+def environment():
+    """Version du code et de l'environnement, pour comparer les rapports"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import matplotlib
+    import streamlit
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "plateforme": platform.platform(),
+        "processeurs": os.cpu_count()
+    }
+
+
+def print_level(level):
+    """Affiche un niveau sous forme de tableau"""
+    print(f"\n=== {level['sessions']} session(s) — {level['duree_s']} s, "
+          f"{level['debit_par_s']} interactions/s, CPU {level['cpu']['coeurs_moyens']} cœur(s), "
+          f"RSS pic {level['rss_mo']['pic']} Mo ===")
+    print(f"{'interaction':<14}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in level["latences"].items():
+        print(f"{name:<14}{stats['n']:>5}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+              f"{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+    if level["exceptions_app"] or level["sessions_echouees"]:
+        print(f"Exceptions dans l'application : {level['exceptions_app']}")
+        for failure in level["sessions_echouees"]:
+            print(f"  {failure}")
+
+
+def compare_reports(previous, current):
+    """Compare les p95 de deux rapports, niveau par niveau"""
+    print(f"\n=== Comparaison {previous['environnement'].get('commit')} "
+          f"→ {current['environnement'].get('commit')} (p95 en ms) ===")
+    previous_levels = {level["sessions"]: level for level in previous["niveaux"]}
+    common = [level for level in current["niveaux"] if level["sessions"] in previous_levels]
+    if not common:
+        print("Aucun niveau de concurrence commun aux deux rapports")
+    for level in common:
+        old = previous_levels[level["sessions"]]
+        for name, stats in level["latences"].items():
+            if name in old["latences"]:
+                before, after = old["latences"][name]["p95_ms"], stats["p95_ms"]
+                ratio = after / before if before else float("inf")
+                print(f"{level['sessions']:>3} session(s)  {name:<14}{before:>10}{after:>10}  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge local de l'application Streamlit")
+    parser.add_argument("--app", default=os.path.join(REPO_ROOT, "app.py"), help="Script Streamlit à charger")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Niveaux de concurrence joués successivement")
+    parser.add_argument("--interactions", type=int, default=20, help="Interactions par session")
+    parser.add_argument("--think-time", type=float, default=0.5,
+                        help="Temps de réflexion moyen entre deux interactions [s]")
+    parser.add_argument("--seed", type=int, default=0, help="Graine des tirages aléatoires")
+    parser.add_argument("--timeout", type=float, default=300, help="Délai maximal d'une relance [s]")
+    parser.add_argument("--warmup-workers", default="0",
+                        help="GEAR_WARMUP_WORKERS pour l'application (0 = pas de préchauffage)")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="Conserver les caches entre deux niveaux (vidés par défaut)")
+    parser.add_argument("--output", help="Fichier JSON du rapport")
+    parser.add_argument("--compare", help="Rapport JSON précédent à comparer")
+    args = parser.parse_args(argv)
+
+    os.environ["GEAR_WARMUP_WORKERS"] = args.warmup_workers
+    import streamlit as st
+    import streamlit.config
+    import streamlit.logger
+
+    # La configuration est lue avant de baisser le niveau, sinon sa lecture
+    # différée rétablit les avertissements (dépréciations) à chaque relance
+    streamlit.config.get_config_options()
+    streamlit.config.set_option("logger.level", "error")
+    streamlit.logger.set_log_level("error")
+    share_apptest_runtime()
+
+    report = {
+        "version": REPORT_VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "environnement": environment(),
+        "parametres": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "niveaux": []
+    }
+
+    for sessions in args.sessions:
+        if not args.keep_cache:
+            st.cache_data.clear()
+        level = run_level(args.app, sessions, args.interactions, args.think_time,
+                          args.seed + sessions, args.timeout)
+        report["niveaux"].append(level)
+        print_level(level)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+        print(f"\nRapport écrit dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            compare_reports(json.load(previous), report)
+
+    failed = any(level["sessions_echouees"] or level["exceptions_app"] for level in report["niveaux"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
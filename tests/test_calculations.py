@@ -0,0 +1,431 @@
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEAR_WARMUP_WORKERS", "0")
+
+from app import (  # noqa: E402
+    COMMON_TEETH, FINE_POINTS_PER_FLANK, STANDARD_MODULES, CacheWarmer, GearCalculator,
+    GearCatalog, GearMesh, GearProfile, GearTrain, MeshingChecker, MeshValidator,
+    StepGenerator, StepReader
+)
+
+
+def _step_stream(module=2.0, teeth=20, pressure_angle=20.0, thickness=10.0,
+                 hub_diameter=10.0, bore_diameter=5.0):
+    content = StepGenerator.create_step_file(
+        module, teeth, pressure_angle, thickness, hub_diameter, bore_diameter
+    )
+    return BytesIO(content.encode("utf-8"))
+
+
+@pytest.mark.parametrize("hub_diameter, bore_diameter", [(0, 0), (10.0, 0), (0, 5.0), (10.0, 5.0)])
+def test_generated_step_is_well_formed(hub_diameter, bore_diameter):
+    index = StepReader.index_stream(_step_stream(hub_diameter=hub_diameter, bore_diameter=bore_diameter))
+    graph = StepReader.check_references(index)
+
+    assert index["entete"] and index["fin"]
+    assert graph["doublons"] == []
+    assert graph["references_orphelines"] == []
+
+
+@pytest.mark.parametrize("module, teeth, pressure_angle, thickness", [
+    (0.5, 8, 14.5, 1.0),
+    (2.0, 20, 20.0, 10.0),
+    (20.0, 200, 25.0, 100.0),
+])
+def test_step_parameters_round_trip(module, teeth, pressure_angle, thickness):
+    expected = StepGenerator.stored_parameters(module, teeth, pressure_angle, thickness)
+    report = StepReader.validate(
+        _step_stream(module, teeth, pressure_angle, thickness), expected
+    )
+
+    assert report["valide"]
+    assert report["parametres"] == pytest.approx(expected)
+
+
+def test_lazy_entity_lookup():
+    stream = _step_stream()
+    index = StepReader.index_stream(stream)
+
+    entity_type, text = StepReader.get_entity(stream, index, 1100)
+    assert entity_type == "MECHANICAL_DESIGN_GEOMETRIC_PRESENTATION_REPRESENTATION"
+    assert text.startswith("#1100 =") and text.endswith(";")
+    assert StepReader.get_entity(stream, index, 60)[0] == "LENGTH_UNIT"
+    assert StepReader.get_entity(stream, index, 9999) is None
+
+
+def test_detects_duplicates_and_dangling_references():
+    content = _step_stream().getvalue()
+    content = content.replace(b"#1010, #1020", b"#1010, #1025")
+    content = content.replace(b"#2 = PRODUCT_DEFINITION_CONTEXT", b"#1 = PRODUCT_DEFINITION_CONTEXT")
+    report = StepReader.validate(BytesIO(content))
+
+    assert not report["valide"]
+    assert report["doublons"] == [1]
+    assert [1000, 1025] in report["references_orphelines"]
+    assert [30, 2] in report["references_orphelines"]
+
+
+def test_detects_parameter_mismatch():
+    expected = StepGenerator.stored_parameters(2.0, 21, 20.0, 10.0)
+    report = StepReader.validate(_step_stream(), expected)
+
+    assert not report["valide"]
+    assert set(report["parametres_differents"]) == {"Teeth Count", "Pitch Diameter"}
+
+
+@pytest.mark.parametrize("module, teeth, pressure_angle, thickness, bore_diameter", [
+    (0.5, 8, 14.5, 1.0, 0.0),
+    (2.0, 20, 20.0, 10.0, 5.0),
+    (20.0, 200, 25.0, 100.0, 50.0),
+])
+def test_vectorized_properties_match_scalar(module, teeth, pressure_angle, thickness, bore_diameter):
+    scalar = GearCalculator.calculate_all_properties(
+        module, teeth, pressure_angle, thickness, 0, bore_diameter
+    )
+    arrays = GearCalculator.calculate_arrays(module, teeth, pressure_angle, thickness, 0, bore_diameter)
+
+    for key in ("primitif", "externe", "base", "fond"):
+        assert arrays[key] == pytest.approx(scalar["diametres"][key])
+    assert arrays["hauteur"] == pytest.approx(scalar["dents"]["hauteur"])
+    assert arrays["volume"] == pytest.approx(scalar["physique"]["volume"])
+    assert arrays["masse"] == pytest.approx(scalar["physique"]["masse"])
+    assert arrays["rapport_contact"] == pytest.approx(scalar["performance"]["rapport_contact"])
+
+
+@pytest.mark.parametrize("parameter, values", [
+    ("teeth", np.arange(8, 201)),
+    ("module", np.arange(0.5, 20.25, 0.5)),
+    ("pressure_angle", np.array([14.5, 17.5, 20.0, 22.5, 25.0])),
+])
+def test_vectorized_sweep_matches_scalar_loop(parameter, values):
+    params = {"module": 2.0, "teeth": 20, "pressure_angle": 20.0, "thickness": 10.0, "bore_diameter": 5.0}
+    curves = GearCalculator.calculate_arrays(**{**params, parameter: values})
+
+    for i, value in enumerate(values):
+        scalar = GearCalculator.calculate_all_properties(**{**params, parameter: value})
+        assert curves["externe"][i] == pytest.approx(scalar["diametres"]["externe"])
+        assert curves["masse"][i] == pytest.approx(scalar["physique"]["masse"])
+        assert curves["rapport_contact"][i] == pytest.approx(scalar["performance"]["rapport_contact"])
+
+
+@pytest.fixture(scope="module")
+def small_catalog(tmp_path_factory):
+    grid = {
+        "module": np.array([1.0, 1.5, 2.0, 3.0]),
+        "dents": np.arange(8, 61),
+        "angle_pression": np.array([14.5, 20.0, 25.0]),
+        "alesage": np.arange(0.0, 20.5, 0.5)
+    }
+    return GearCatalog.load(str(tmp_path_factory.mktemp("catalog") / "gear_catalog"), grid)
+
+
+@pytest.mark.parametrize("bounds, allowed", [
+    ({"externe": (40, 60), "alesage": (8, None), "rapport_contact": (1.4, None)}, None),
+    ({"module": (1.5, 1.5), "dents": (20, 40)}, {"angle_pression": [20.0]}),
+    ({"fond": (None, 30), "volume_par_mm": (500, 2000)}, None),
+    ({}, {"angle_pression": [25.0]}),
+    ({"externe": (1000, None)}, None),
+])
+def test_catalog_query_matches_full_scan(small_catalog, bounds, allowed):
+    columns = small_catalog["colonnes"]
+    expected = np.ones(small_catalog["taille"], dtype=bool)
+    for name, (low, high) in bounds.items():
+        values = columns[name]
+        if low is not None:
+            expected &= values >= values.dtype.type(low)
+        if high is not None:
+            expected &= values <= values.dtype.type(high)
+    for name, values in (allowed or {}).items():
+        expected &= np.isin(columns[name], np.asarray(values, dtype=columns[name].dtype))
+
+    rows = GearCatalog.query(small_catalog, bounds, allowed)
+
+    np.testing.assert_array_equal(rows, np.flatnonzero(expected))
+
+
+def test_catalog_rows_are_valid_gears(small_catalog):
+    columns = small_catalog["colonnes"]
+
+    assert small_catalog["taille"] > 0
+    assert np.all(columns["alesage"] < columns["fond"])
+    row = 123
+    properties = GearCalculator.calculate_all_properties(
+        float(columns["module"][row]), int(columns["dents"][row]),
+        float(columns["angle_pression"][row]), 10.0, 0, float(columns["alesage"][row])
+    )
+    table = GearCatalog.rows_table(small_catalog, np.array([row]), 10.0)
+    assert table["externe"][0] == pytest.approx(properties["diametres"]["externe"])
+    assert table["masse"][0] == pytest.approx(properties["physique"]["masse"], rel=1e-6)
+
+    # Chaque ligne est maillable : il suffit de construire, pour chaque
+    # (module, dents, angle), la roue au plus grand alésage du catalogue
+    keys = np.column_stack((columns["module"], columns["dents"], columns["angle_pression"]))
+    order = np.lexsort((columns["alesage"], *keys.T[::-1]))
+    last = np.append(np.any(np.diff(keys[order], axis=0) != 0, axis=1), True)
+    for row in order[last]:
+        module, teeth = float(columns["module"][row]), int(columns["dents"][row])
+        outline = GearProfile.generate_outline(module, teeth, float(columns["angle_pression"][row]),
+                                               0.1, FINE_POINTS_PER_FLANK)
+        GearMesh.build(outline, module, teeth, 10.0, float(columns["alesage"][row]), "grossier")
+
+
+def _gear_mesh(module=2.0, teeth=20, pressure_angle=20.0, thickness=10.0, bore_diameter=5.0, level="fin"):
+    outline = GearProfile.generate_outline(module, teeth, pressure_angle, 0.1, FINE_POINTS_PER_FLANK)
+    return GearMesh.build(outline, module, teeth, thickness, bore_diameter, level)
+
+
+@pytest.mark.parametrize("module, teeth, pressure_angle, thickness, bore_diameter, level", [
+    (0.5, 8, 14.5, 1.0, 0.0, "grossier"),
+    (2.0, 20, 20.0, 10.0, 5.0, "moyen"),
+    (2.0, 20, 20.0, 10.0, 5.0, "fin"),
+    (20.0, 200, 25.0, 100.0, 50.0, "fin"),
+])
+def test_generated_meshes_are_watertight(module, teeth, pressure_angle, thickness, bore_diameter, level):
+    mesh = _gear_mesh(module, teeth, pressure_angle, thickness, bore_diameter, level)
+    bounds = MeshValidator.volume_bounds(module, teeth, pressure_angle, thickness, bore_diameter)
+    report = MeshValidator.validate(mesh["sommets"], mesh["faces"], bounds)
+
+    assert report["valide"], report
+    assert report["aretes"] * 2 == report["facettes"] * 3
+
+
+def test_oversized_bore_is_rejected():
+    max_bore = GearMesh.max_bore_diameter(2.0, 20)
+    mesh = _gear_mesh(bore_diameter=max_bore - 0.5)
+    bounds = MeshValidator.volume_bounds(2.0, 20, 20.0, 10.0, max_bore - 0.5)
+    assert MeshValidator.validate(mesh["sommets"], mesh["faces"], bounds)["valide"]
+
+    with pytest.raises(ValueError, match="Alésage"):
+        _gear_mesh(bore_diameter=33.5)
+
+
+def test_binary_stl_round_trip_is_valid(tmp_path):
+    mesh = _gear_mesh()
+    path = str(tmp_path / "gear.stl")
+    StepGenerator.write_stl_binary(path, 2.0, 20, mesh, chunk_size=1000)
+    report = MeshValidator.validate_stl(path, MeshValidator.volume_bounds(2.0, 20, 20.0, 10.0, 5.0))
+
+    assert report["valide"], report
+    assert report["sommets"] == len(mesh["sommets"])
+    assert report["volume"] == pytest.approx(
+        MeshValidator.validate(mesh["sommets"], mesh["faces"])["volume"], rel=1e-5
+    )
+
+
+def test_truncated_stl_is_rejected(tmp_path):
+    path = str(tmp_path / "gear.stl")
+    mesh = _gear_mesh()
+    StepGenerator.write_stl_binary(path, 2.0, 20, mesh)
+    assert MeshValidator.stl_size_error(path) == (len(mesh["faces"]), None)
+
+    with open(path, "r+b") as stl_file:
+        stl_file.truncate(os.path.getsize(path) - 50)
+
+    assert not MeshValidator.stl_size_error(path)[1]["valide"]
+    assert not MeshValidator.validate_stl(path)["valide"]
+
+
+def test_detects_mesh_defects():
+    mesh = _gear_mesh(level="grossier")
+    vertices, faces = mesh["sommets"], mesh["faces"]
+
+    opened = MeshValidator.validate(vertices, faces[1:])
+    assert not opened["valide"] and opened["aretes_ouvertes"] == 3
+
+    flipped = faces.copy()
+    flipped[0] = flipped[0, ::-1]
+    report = MeshValidator.validate(vertices, flipped)
+    assert not report["valide"] and report["aretes_mal_orientees"] == 3
+
+    duplicated = MeshValidator.validate(vertices, np.vstack([faces, faces[:1, ::-1]]))
+    assert not duplicated["valide"] and duplicated["aretes_non_manifold"] == 3
+
+    collapsed = faces.copy()
+    collapsed[0, 2] = collapsed[0, 1]
+    assert MeshValidator.validate(vertices, collapsed)["triangles_degeneres"] == 1
+
+    inverted = MeshValidator.validate(vertices, faces[:, ::-1])
+    assert inverted["aretes_ouvertes"] == 0 and inverted["volume"] < 0 and not inverted["valide"]
+
+    bounds = MeshValidator.volume_bounds(2.0, 20, 20.0, 10.0, 5.0)
+    assert not MeshValidator.validate(vertices * 1.1, faces, bounds)["valide"]
+
+
+def test_open_single_triangle_is_rejected():
+    report = MeshValidator.validate(np.eye(3), np.array([[0, 1, 2]]))
+
+    assert not report["valide"]
+    assert report["aretes_ouvertes"] == 3
+
+
+def test_weld_merges_signed_zeros():
+    triangles = np.array([
+        [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+        [[-0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 0.0, -0.0]],
+    ])
+    vertices, faces = MeshValidator.weld(triangles)
+
+    assert len(vertices) == 3
+    np.testing.assert_array_equal(vertices[faces], triangles + 0.0)
+
+
+def test_meshing_clearance_matches_backlash():
+    report = MeshingChecker.check_mesh(2.0, 20, 20, 20.0, backlash=0.1)
+
+    assert report["valide"]
+    assert report["interference_max"] == 0
+    assert report["jeu_flanc_min"] == pytest.approx(0.1 * np.cos(np.radians(20.0)) / 2, rel=0.01)
+
+
+@pytest.mark.parametrize("module, teeth, mate_teeth", [
+    (2.0, 10, 10),
+    (2.0, 11, 11),
+    (2.0, 12, 12),
+    (2.0, 16, 200),
+])
+def test_meshing_detects_interference(module, teeth, mate_teeth):
+    report = MeshingChecker.check_mesh(module, teeth, mate_teeth, 20.0)
+
+    assert report["interference_max"] > 0
+    assert not report["valide"]
+
+
+@pytest.mark.parametrize("module, teeth, mate_teeth", [
+    (2.0, 13, 13),
+    (2.0, 17, 200),
+    (20.0, 200, 20),
+])
+def test_meshing_accepts_interference_free_pairs(module, teeth, mate_teeth):
+    report = MeshingChecker.check_mesh(module, teeth, mate_teeth, 20.0)
+
+    assert report["valide"]
+    assert report["interference_max"] == 0
+
+
+@pytest.mark.parametrize("module, teeth, pressure_angle, backlash, reason", [
+    (0.5, 20, 20.0, 2.0, "demi-pas"),
+    (0.5, 20, 20.0, 0.785, "pointues"),
+    (0.5, 8, 25.0, 0.3, "pointues"),
+])
+def test_meshing_rejects_backlash_beyond_tooth_thickness(module, teeth, pressure_angle, backlash, reason):
+    report = MeshingChecker.check_mesh(module, teeth, 20, pressure_angle, backlash)
+
+    assert not report["valide"]
+    assert reason in report["erreur"]
+
+
+def test_largest_accepted_backlash_gives_valid_mesh():
+    backlash = 0.62
+    assert GearProfile.tooth_error(0.5, 20, 20.0, backlash) is None
+    assert MeshingChecker.check_mesh(0.5, 20, 20, 20.0, backlash)["erreur"] is None
+
+    outline = GearProfile.generate_outline(0.5, 20, 20.0, backlash, FINE_POINTS_PER_FLANK)
+    mesh = GearMesh.build(outline, 0.5, 20, 10.0)
+    report = MeshValidator.validate(mesh["sommets"], mesh["faces"],
+                                    MeshValidator.volume_bounds(0.5, 20, 20.0, 10.0, 0))
+    assert report["valide"], report
+
+
+TRAIN_STAGES = [
+    {"module": 2.0, "z_menant": 20, "z_mene": 40, "angle_pression": 20.0, "rendement": 0.98},
+    {"module": 2.0, "z_menant": 15, "z_mene": 45, "angle_pression": 20.0, "rendement": 0.95},
+]
+
+
+def test_gear_train_steady_state_matches_hand_calculation():
+    train = GearTrain.simulate(TRAIN_STAGES, np.linspace(0, 1, 11), 1500.0, 10.0)
+
+    assert train["rapport_global"] == pytest.approx(6.0)
+    assert train["arbres"]["vitesse"][:, -1] == pytest.approx([1500.0, -750.0, 250.0])
+    assert train["arbres"]["couple"][:, -1] == pytest.approx([10.0, 19.6, 55.86])
+    assert train["engrenements"]["effort_tangentiel"][0, -1] == pytest.approx(500.0)
+    assert train["engrenements"]["effort_radial"][0, -1] == pytest.approx(500.0 * np.tan(np.radians(20.0)))
+
+
+def test_gear_train_angles_keep_pairs_in_phase():
+    train = GearTrain.simulate(TRAIN_STAGES, np.linspace(0, 1, 11), 1500.0, 10.0)
+    driver, driven = GearTrain.gear_angles(TRAIN_STAGES, train["arbres"]["angle"])
+
+    for i, stage in enumerate(TRAIN_STAGES):
+        # Roulement sans glissement : z1·Δθ1 + z2·Δθ2 = 0 à chaque instant
+        rolling = stage["z_menant"] * (driver[i] - driver[i, 0]) + stage["z_mene"] * (driven[i] - driven[i, 0])
+        assert rolling == pytest.approx(np.zeros_like(rolling), abs=1e-9)
+
+        # À l'origine, le creux de la roue menée fait face à la dent menante
+        pitch = 2 * np.pi / stage["z_mene"]
+        assert (driven[i, 0] - np.pi - pitch / 2) % pitch == pytest.approx(0.0, abs=1e-9)
+
+
+def test_gear_train_layout_separates_non_meshing_wheels():
+    stages = [
+        {"module": 2.0, "z_menant": 20, "z_mene": 20, "angle_pression": 20.0, "rendement": 0.98},
+        {"module": 2.0, "z_menant": 18, "z_mene": 54, "angle_pression": 20.0, "rendement": 0.98},
+        {"module": 3.0, "z_menant": 12, "z_mene": 30, "angle_pression": 20.0, "rendement": 0.98},
+    ]
+    driver_centers, driven_centers = GearTrain.layout(stages)
+
+    centers = np.concatenate((driver_centers, driven_centers))
+    radii = np.array([s["module"] * (s["z_menant"] + 2) / 2 for s in stages]
+                     + [s["module"] * (s["z_mene"] + 2) / 2 for s in stages])
+    n = len(stages)
+    for a in range(2 * n):
+        for b in range(a + 1, 2 * n):
+            distance = np.hypot(*(centers[a] - centers[b]))
+            if b == a + n:
+                # Paire en prise : entraxe de fonctionnement
+                stage = stages[a]
+                assert distance == pytest.approx(stage["module"] * (stage["z_menant"] + stage["z_mene"]) / 2)
+            else:
+                assert distance > radii[a] + radii[b]
+
+
+def test_warmup_grid_reads_environment(monkeypatch):
+    monkeypatch.delenv("GEAR_WARMUP_MODULES", raising=False)
+    monkeypatch.delenv("GEAR_WARMUP_TEETH", raising=False)
+    assert len(CacheWarmer.preset_grid()) == len(STANDARD_MODULES) * len(COMMON_TEETH)
+
+    monkeypatch.setenv("GEAR_WARMUP_MODULES", " 1, 2.5 ,")
+    monkeypatch.setenv("GEAR_WARMUP_TEETH", "12,20")
+    assert CacheWarmer.preset_grid() == [(1.0, 12), (1.0, 20), (2.5, 12), (2.5, 20)]
+
+
+def _run_warmup(presets, workers=2, timeout=60):
+    status = CacheWarmer.start(presets, workers)
+    deadline = time.monotonic() + timeout
+    while status["termines"] < status["total"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return status
+
+
+def test_warmup_times_every_stage():
+    status = _run_warmup([(1.0, 12), (2.0, 20)])
+
+    assert status["termines"] == status["total"] == 2
+    assert status["erreurs"] == []
+    assert status["fin"] is not None
+    assert {name: len(d) for name, d in status["durees"].items()} == dict.fromkeys(CacheWarmer.STAGES, 2)
+
+
+def test_warmup_records_failing_preset():
+    # Alésage par défaut (5 mm) trop grand pour m = 0.5, z = 12 : l'étape
+    # "profil" échoue, les suivantes sont sautées mais le préréglage compte
+    status = _run_warmup([(0.5, 12), (1.0, 12)])
+
+    assert status["termines"] == 2
+    assert len(status["erreurs"]) == 1 and "m = 0.5 mm · z = 12" in status["erreurs"][0]
+    assert len(status["durees"]["proprietes"]) == 2
+    assert all(len(status["durees"][name]) == 1 for name in ("profil", "apercu", "export"))
+
+
+def test_warmup_disabled_without_workers():
+    status = CacheWarmer.start([(1.0, 12)], 0)
+
+    assert status["total"] == 0 and status["termines"] == 0
+    assert status["fin"] == status["debut"]